@@ -26,57 +26,216 @@ Version: 1.2
 Date: 2026-01-29
 """
 
+from functools import lru_cache
+from typing import Union
+
 import numpy as np
 import pandas as pd
+from scipy.linalg.blas import get_blas_funcs
 from scipy.optimize import minimize
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: fall back to the pure NumPy estimator
+    njit = None
+
 
 # ==============================================================================
 # SECTION 1: EMBEDDED OPTIMIZER WITH SHRINKAGE (from src/optimizer.py)
 # ==============================================================================
 
-def ledoit_wolf_shrinkage(returns: pd.DataFrame) -> np.ndarray:
+# Reusable flat demean buffers, one per dtype (grown on demand)
+_DEMEAN_SCRATCH = {}
+
+
+def _demean_into_scratch(X: np.ndarray) -> np.ndarray:
+    """
+    Subtract column means from X into a persistent scratch buffer.
+
+    Avoids allocating a new (N x M) array on every rebalance. The returned
+    array is a C-contiguous view that is overwritten by the next call.
+
+    Args:
+        X: Array of shape (N x M)
+
+    Returns:
+        Demeaned (N x M) view into the scratch buffer
+    """
+    n, p = X.shape
+    scratch = _DEMEAN_SCRATCH.get(X.dtype)
+
+    if scratch is None or scratch.size < n * p:
+        scratch = np.empty(max(n * p, 1024 * 16), dtype=X.dtype)
+        _DEMEAN_SCRATCH[X.dtype] = scratch
+
+    out = scratch[:n * p].reshape(n, p)
+    np.subtract(X, X.mean(axis=0), out=out)
+    return out
+
+
+def _symmetric_gram(X: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Compute alpha * X'X with a BLAS symmetric rank-k update (syrk).
+
+    syrk only fills the upper triangle, half the FLOPs of a general matrix
+    product; the lower triangle is mirrored afterwards. The single or double
+    precision routine is picked from the dtype of X.
+
+    Args:
+        X: Array of shape (N x M)
+        alpha: Scale factor applied to X'X
+
+    Returns:
+        Symmetric (M x M) float64 matrix
+    """
+    # X.T is Fortran-ordered, so BLAS reads it without a copy
+    syrk = get_blas_funcs('syrk', (X,))
+    upper = syrk(alpha=alpha, a=X.T, trans=0, lower=0)
+    gram = np.triu(upper) + np.triu(upper, 1).T
+    return gram.astype(np.float64, copy=False)
+
+
+def _lw_kernel(X: np.ndarray) -> np.ndarray:
+    """
+    Fused Ledoit-Wolf kernel (compiled with Numba when available).
+
+    Computes column means, sample covariance and the asymptotic variance
+    term pi in explicit loops over X, so that the whole estimator runs
+    without intermediate array allocations. Accumulation is always done in
+    float64, whatever the input precision.
+
+    Args:
+        X: C-contiguous float32 or float64 array of returns (N x M)
+
+    Returns:
+        Shrunk covariance matrix
+    """
+    n, p = X.shape
+
+    # Column means
+    mean = np.zeros(p)
+    for k in range(n):
+        for i in range(p):
+            mean[i] += X[k, i]
+    for i in range(p):
+        mean[i] /= n
+
+    # Sample covariance and sum of squared cross products (upper triangle)
+    sample_cov = np.zeros((p, p))
+    cross_sq = np.zeros((p, p))
+    for k in range(n):
+        for i in range(p):
+            di = X[k, i] - mean[i]
+            for j in range(i, p):
+                prod = di * (X[k, j] - mean[j])
+                sample_cov[i, j] += prod
+                cross_sq[i, j] += prod * prod
+
+    # Symmetrize and accumulate pi = sum_ij Var(x_i * x_j)
+    pi = 0.0
+    for i in range(p):
+        for j in range(i, p):
+            s_ij = sample_cov[i, j] / n
+            pi_ij = cross_sq[i, j] / n - s_ij * s_ij
+            sample_cov[i, j] = s_ij
+            sample_cov[j, i] = s_ij
+            pi += pi_ij if i == j else 2.0 * pi_ij
+
+    # Average correlation of the constant correlation prior
+    corr_sum = 0.0
+    for i in range(p):
+        for j in range(p):
+            if i != j:
+                corr_sum += sample_cov[i, j] / np.sqrt(sample_cov[i, i] * sample_cov[j, j])
+    r_bar = corr_sum / (p * (p - 1))
+
+    # Prior covariance and squared Frobenius distance to the sample covariance
+    prior = np.empty((p, p))
+    gamma = 0.0
+    for i in range(p):
+        for j in range(p):
+            if i == j:
+                prior[i, j] = sample_cov[i, i]
+            else:
+                prior[i, j] = r_bar * np.sqrt(sample_cov[i, i] * sample_cov[j, j])
+            diff = sample_cov[i, j] - prior[i, j]
+            gamma += diff * diff
+
+    # Shrinkage parameter
+    kappa = (pi - gamma) / n
+    shrinkage = max(0.0, min(1.0, kappa / gamma))
+
+    return shrinkage * prior + (1 - shrinkage) * sample_cov
+
+
+if njit is not None:
+    # Compiled eagerly at import for the C-contiguous float32/float64 inputs
+    # rebalance produces, so no type inference or JIT happens mid-backtest.
+    # No on-disk cache: it records the importing module's name, which a
+    # single-file strategy loaded under another name cannot resolve.
+    _lw_kernel = njit(
+        ['f8[:, ::1](f4[:, ::1])', 'f8[:, ::1](f8[:, ::1])'],
+        fastmath=True,
+        boundscheck=False
+    )(_lw_kernel)
+
+
+def ledoit_wolf_shrinkage(returns: np.ndarray) -> np.ndarray:
     """
     Compute Ledoit-Wolf shrinkage covariance estimator.
 
     Shrinks sample covariance toward constant correlation matrix.
     Reduces estimation noise for more stable out-of-sample performance.
+    Uses the fused Numba kernel when Numba is installed. float32 returns
+    are accepted; the covariance is always returned in float64.
 
     Reference: Ledoit & Wolf (2004) "Honey, I Shrunk the Sample Covariance Matrix"
 
     Args:
-        returns: DataFrame of asset returns (N x M where N=days, M=assets)
+        returns: Array of asset returns (N x M where N=days, M=assets)
 
     Returns:
         Shrunk covariance matrix
     """
-    X = returns.values
+    X = returns
+
+    if njit is not None:
+        if X.dtype != np.float32:
+            X = X.astype(np.float64, copy=False)
+        return _lw_kernel(np.ascontiguousarray(X))
+
     n, p = X.shape
 
-    # Demean returns
-    X = X - X.mean(axis=0)
+    # Demean returns (N x M stages keep the input precision)
+    X = _demean_into_scratch(X)
 
-    # Sample covariance
-    sample_cov = (X.T @ X) / n
+    # Sample covariance (M x M stages run in float64)
+    sample_cov = _symmetric_gram(X, 1.0 / n)
 
     # Prior: constant correlation matrix
     var = np.diag(sample_cov)
     sqrt_var = np.sqrt(var)
 
+    sqrt_var_outer = np.outer(sqrt_var, sqrt_var)
+
     # Average correlation
-    r_bar = (np.sum(sample_cov / np.outer(sqrt_var, sqrt_var)) - p) / (p * (p - 1))
+    r_bar = (np.sum(sample_cov / sqrt_var_outer) - p) / (p * (p - 1))
 
     # Prior covariance
-    prior = r_bar * np.outer(sqrt_var, sqrt_var)
+    prior = r_bar * sqrt_var_outer
     np.fill_diagonal(prior, var)
 
     # Shrinkage intensity
     # Simplified formula for computational efficiency
-    gamma = np.linalg.norm(sample_cov - prior, 'fro') ** 2
+    # Squared Frobenius norm without the sqrt/square round trip
+    diff = sample_cov - prior
+    gamma = np.einsum('ij,ij->', diff, diff)
 
-    # Asymptotic variance of sample covariance
-    # Using diagonal elements for simplicity
-    pi = np.sum(np.var(X ** 2, axis=0))
+    # Asymptotic variance of sample covariance entries:
+    # pi = (1/n) * sum_k ||x_k x_k' - S||_F^2 = sum_ij ((X^2)'(X^2) / n - S^2)_ij
+    X_sq = X * X
+    pi = np.sum(_symmetric_gram(X_sq, 1.0 / n) - sample_cov ** 2)
 
     # Shrinkage parameter
     kappa = (pi - gamma) / n
@@ -88,80 +247,174 @@ def ledoit_wolf_shrinkage(returns: pd.DataFrame) -> np.ndarray:
     return shrunk_cov
 
 
-def optimize_weights(returns: pd.DataFrame, use_shrinkage: bool = True) -> np.ndarray:
+def _ccd_risk_parity(cov_matrix: np.ndarray, budgets: np.ndarray = None,
+                     tol: float = 1e-10, maxiter: int = 50) -> np.ndarray:
+    """
+    Solve the risk budgeting problem by cyclical coordinate descent (CCD).
+
+    Works on the correlation form of the covariance matrix and minimizes the
+    convex log-barrier objective 0.5 * x'Cx - b'log(x). At the optimum every
+    asset's risk contribution x_i * (Cx)_i equals its budget b_i. Each
+    coordinate update is the positive root of a scalar quadratic, followed
+    by a rescaling step once per sweep. The portfolio variance used by the
+    rescaling step is evaluated through a Cholesky factor of C, factored
+    once up front.
+
+    Reference: Griveau-Billion, Richard & Roncalli (2013) "A Fast Algorithm
+    for Computing High-dimensional Risk Parity Portfolios"
+
+    Args:
+        cov_matrix: Covariance matrix of asset returns
+        budgets: Risk budgets per asset (default: equal budgets)
+        tol: Convergence tolerance on the change of x between sweeps
+        maxiter: Maximum number of sweeps over all coordinates
+
+    Returns:
+        Array of weights summing to 1.0, or None if not converged
+
+    Raises:
+        np.linalg.LinAlgError: If the covariance matrix is not positive definite
+    """
+    n_assets = cov_matrix.shape[0]
+
+    if budgets is None:
+        budgets = np.full(n_assets, 1.0 / n_assets)
+
+    # Correlation form: unit diagonal keeps the iteration well scaled
+    vols = np.sqrt(np.diag(cov_matrix))
+    corr = cov_matrix / np.outer(vols, vols)
+    budget_sum = budgets.sum()
+
+    # C = L L', so x'Cx = ||L'x||^2
+    chol = np.linalg.cholesky(corr)
+
+    x = np.sqrt(1.0 / np.diag(corr))
+
+    for _ in range(maxiter):
+        x_prev = x.copy()
+
+        for i in range(n_assets):
+            a = corr[i, i]
+            c = corr[i] @ x - a * x[i]
+            x[i] = (-c + np.sqrt(c * c + 4 * a * budgets[i])) / (2 * a)
+
+        # Rescale so that total risk equals total budget
+        x_chol = chol.T @ x
+        x *= np.sqrt(budget_sum / (x_chol @ x_chol))
+
+        if np.max(np.abs(x - x_prev)) < tol:
+            weights = x / vols
+            return weights / weights.sum()
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def _positive_bounds(n_assets: int) -> tuple:
+    """Strictly positive L-BFGS-B bounds, built once per universe size."""
+    return tuple((1e-8, None) for _ in range(n_assets))
+
+
+def _lbfgs_risk_parity(cov_matrix: np.ndarray) -> np.ndarray:
+    """
+    Solve the equal risk contribution problem with L-BFGS-B.
+
+    Minimizes the convex log-barrier objective f(y) = 0.5 * y'Cy - sum(log(y))
+    on the correlation matrix C, using its closed-form gradient Cy - 1/y.
+    Used when the CCD iteration does not converge.
+
+    Args:
+        cov_matrix: Covariance matrix of asset returns
+
+    Returns:
+        Array of weights summing to 1.0, or None if the solver failed
+    """
+    n_assets = cov_matrix.shape[0]
+
+    vols = np.sqrt(np.diag(cov_matrix))
+    corr = cov_matrix / np.outer(vols, vols)
+
+    def objective(y):
+        corr_y = corr @ y
+        return 0.5 * y @ corr_y - np.log(y).sum(), corr_y - 1.0 / y
+
+    result = minimize(
+        objective,
+        x0=np.ones(n_assets),
+        jac=True,
+        method='L-BFGS-B',
+        bounds=_positive_bounds(n_assets)
+    )
+
+    if not result.success:
+        return None
+
+    weights = result.x / vols
+    return weights / weights.sum()
+
+
+def optimize_weights(returns: Union[np.ndarray, pd.DataFrame], use_shrinkage: bool = True) -> np.ndarray:
     """
     Calculate risk parity weights for a portfolio (v1.2).
 
     The objective is to find weights such that each asset contributes equally
-    to the portfolio's total risk. This is achieved by minimizing the standard
-    deviation of risk contributions across all assets.
+    to the portfolio's total risk. This is solved exactly with cyclical
+    coordinate descent on the equivalent convex risk budgeting problem,
+    with L-BFGS-B on the same problem as a fallback.
 
     v1.2 Enhancement: Optional Ledoit-Wolf covariance shrinkage for more
     robust estimation and better out-of-sample performance.
 
     Args:
-        returns: DataFrame of asset returns (N x M where N=days, M=assets)
+        returns: Array or DataFrame of asset returns (N x M where N=days, M=assets)
         use_shrinkage: Whether to use Ledoit-Wolf shrinkage (default: True)
 
     Returns:
         Array of optimal weights summing to 1.0
 
     Raises:
-        ValueError: If returns DataFrame is empty or has invalid data
+        ValueError: If returns array is empty or has invalid data
     """
-    if returns.empty:
-        raise ValueError("Returns DataFrame is empty")
+    if isinstance(returns, pd.DataFrame):
+        returns = returns.to_numpy(copy=False)
+
+    if returns.size == 0:
+        raise ValueError("Returns array is empty")
 
-    if returns.isnull().any().any():
+    if np.isnan(returns).any():
         raise ValueError("Returns contains NaN values")
 
     # Compute covariance matrix (with optional shrinkage)
     if use_shrinkage:
         cov_matrix = ledoit_wolf_shrinkage(returns)
     else:
-        cov_matrix = returns.cov().values
-
-    n_assets = len(returns.columns)
-
-    def risk_parity_objective(weights):
-        """Objective function: minimize std deviation of risk contributions."""
-        portfolio_vol = np.sqrt(weights @ cov_matrix @ weights)
+        # Unbiased sample covariance
+        centered = _demean_into_scratch(returns)
+        cov_matrix = _symmetric_gram(centered, 1.0 / (returns.shape[0] - 1))
 
-        # Avoid division by zero
-        if portfolio_vol < 1e-10:
-            return 1e10
+    cov_matrix = np.ascontiguousarray(cov_matrix, dtype=np.float64)
 
-        marginal_contrib = cov_matrix @ weights
-        risk_contrib = weights * marginal_contrib / portfolio_vol
-
-        # Minimize standard deviation of risk contributions
-        return np.std(risk_contrib)
-
-    # Initial guess: equal weights
-    x0 = np.array([1/n_assets] * n_assets)
-
-    # Constraints: weights sum to 1
-    constraints = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0}
+    # Singular covariance (zero-variance asset): inverse volatility weights
+    if np.any(np.diag(cov_matrix) < 1e-20):
+        print("Warning: Singular covariance matrix, using inverse volatility weights")
+        return _inverse_volatility_weights(cov_matrix)
 
-    # Bounds: no leverage, no shorting
-    bounds = tuple((0, 1) for _ in range(n_assets))
+    try:
+        weights = _ccd_risk_parity(cov_matrix)
+    except np.linalg.LinAlgError:
+        print("Warning: Covariance matrix not positive definite, using inverse volatility weights")
+        return _inverse_volatility_weights(cov_matrix)
 
-    # Optimize
-    result = minimize(
-        risk_parity_objective,
-        x0,
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints,
-        options={'maxiter': 1000, 'ftol': 1e-9}
-    )
+    if weights is None:
+        # CCD did not converge: solve the same convex problem with L-BFGS-B
+        weights = _lbfgs_risk_parity(cov_matrix)
 
-    if not result.success:
+    if weights is None:
         # Fallback: inverse volatility weights
-        print(f"Warning: Optimization failed ({result.message}), using inverse volatility weights")
+        print("Warning: Optimization did not converge, using inverse volatility weights")
         return _inverse_volatility_weights(cov_matrix)
 
-    return result.x
+    return weights
 
 
 def risk_contribution(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
@@ -199,13 +452,33 @@ def _inverse_volatility_weights(cov_matrix: np.ndarray) -> np.ndarray:
     """
     Fallback method: inverse volatility weighting.
 
+    Results are memoized on the covariance diagonal, since the fallback
+    tends to recur on identical inputs across parameter sweeps.
+
     Args:
         cov_matrix: Covariance matrix of asset returns
 
     Returns:
         Weights inversely proportional to asset volatilities
     """
-    vols = np.sqrt(np.diag(cov_matrix))
+    variances = np.ascontiguousarray(np.diag(cov_matrix), dtype=np.float64)
+
+    # Copy so callers cannot mutate the cached array
+    return _inverse_volatility_from_variances(variances.tobytes()).copy()
+
+
+@lru_cache(maxsize=32)
+def _inverse_volatility_from_variances(variances_bytes: bytes) -> np.ndarray:
+    """
+    Compute inverse volatility weights from raw float64 variance bytes.
+
+    Args:
+        variances_bytes: Asset variances as float64 bytes (hashable cache key)
+
+    Returns:
+        Weights inversely proportional to asset volatilities
+    """
+    vols = np.sqrt(np.frombuffer(variances_bytes, dtype=np.float64))
 
     # Avoid division by zero
     vols = np.where(vols < 1e-10, 1e-10, vols)
@@ -220,12 +493,16 @@ def _inverse_volatility_weights(cov_matrix: np.ndarray) -> np.ndarray:
 # SECTION 2: JOINQUANT STRATEGY WITH ADAPTIVE REBALANCING
 # ==============================================================================
 
+# Number of lookback windows whose optimized weights are kept in memory
+COV_CACHE_SIZE = 4
+
+
 def initialize(context):
     """
     Initialize All Weather v1.2 strategy.
 
     This function runs once at the start of the backtest/live trading.
-    Sets up the ETF universe, strategy parameters, and schedules rebalancing.
+    Sets up the ETF universe, strategy parameters, and rebalancing state.
 
     Args:
         context: JoinQuant context object containing strategy state
@@ -251,12 +528,14 @@ def initialize(context):
     # State Tracking
     context.rebalance_count = 0             # Number of rebalances executed
     context.last_rebalance_date = None      # Last rebalance date for logging
-    context.target_weights = None           # Target weights from last rebalance
+    context.target_weights = None           # Target weights array (aligned with securities)
     context.skipped_rebalances = 0          # Number of rebalances skipped due to low drift
+    context._cov_cache = {}                 # Optimized weights keyed by lookback window dates
+    context._logP_cache = None              # (dates, log prices) of the last history() window
+    context._last_check_week = None         # (ISO year, ISO week) of the last drift check
 
-    # Schedule weekly Monday rebalancing check at market open
-    # weekday: 1=Monday, 2=Tuesday, ..., 5=Friday
-    run_weekly(rebalance, weekday=1, time='open')
+    # Weekly rebalancing check runs from handle_data on the first trading
+    # day of each week (Monday, or next trading day if holiday)
 
     # Set commission rate for all orders
     set_order_cost(OrderCost(
@@ -276,6 +555,27 @@ def initialize(context):
     log.info("=" * 60)
 
 
+def current_position_values(context) -> np.ndarray:
+    """
+    Get the market value of each position, aligned with context.securities.
+
+    Args:
+        context: JoinQuant context object
+
+    Returns:
+        Array of position values (0.0 for securities not held)
+    """
+    # Read the platform positions dict once per call
+    positions = context.portfolio.positions
+    held = [positions.get(s) for s in context.securities]
+
+    return np.fromiter(
+        (p.total_amount * p.price if p else 0.0 for p in held),
+        dtype=np.float64,
+        count=len(context.securities)
+    )
+
+
 def calculate_portfolio_drift(context) -> float:
     """
     Calculate maximum drift of current portfolio from target weights.
@@ -298,25 +598,47 @@ def calculate_portfolio_drift(context) -> float:
     if portfolio_value == 0:
         return float('inf')
 
-    # Calculate current weights
-    current_weights = {}
-    for security in context.securities:
-        position = context.portfolio.positions.get(security)
-        if position:
-            current_value = position.total_amount * position.price
-            current_weights[security] = current_value / portfolio_value
-        else:
-            current_weights[security] = 0.0
+    current_values = current_position_values(context)
+
+    # Maximum absolute drift across assets
+    return float(np.abs(current_values / portfolio_value - context.target_weights).max())
+
 
-    # Calculate drift for each asset
-    drifts = []
-    for security in context.securities:
-        current_w = current_weights.get(security, 0.0)
-        target_w = context.target_weights.get(security, 0.0)
-        drift = abs(current_w - target_w)
-        drifts.append(drift)
+def update_log_prices(context, hist_prices: pd.DataFrame) -> np.ndarray:
+    """
+    Return log prices for the history() window, reusing the previous window.
+
+    Consecutive rebalances share most of their lookback window, so only the
+    bars that are new since the last call go through np.log. The cached
+    part is reused only if the overlapping bar still has the same price
+    (pre-adjusted prices are rescaled after a dividend or split).
+
+    Args:
+        context: JoinQuant context object
+        hist_prices: Price DataFrame from history() (dates x securities)
+
+    Returns:
+        Array of float64 log prices aligned with hist_prices
+    """
+    dates = hist_prices.index
+    prices = hist_prices.to_numpy(dtype=np.float64)
+    log_prices = None
+
+    if context._logP_cache is not None:
+        cached_dates, cached_log_prices = context._logP_cache
+        start = cached_dates.searchsorted(dates[0])
+        overlap = len(cached_dates) - start
 
-    return max(drifts)
+        if (0 < overlap <= len(dates)
+                and cached_dates[start:].equals(dates[:overlap])
+                and np.allclose(cached_log_prices[-1], np.log(prices[overlap - 1]), equal_nan=True)):
+            log_prices = np.concatenate([cached_log_prices[start:], np.log(prices[overlap:])])
+
+    if log_prices is None:
+        log_prices = np.log(prices)
+
+    context._logP_cache = (dates, log_prices)
+    return log_prices
 
 
 def rebalance(context):
@@ -332,7 +654,7 @@ def rebalance(context):
     1. Calculate portfolio drift from last target weights
     2. Skip rebalance if drift < threshold (5%)
     3. If rebalancing, fetch historical prices (253 days for 252-day returns)
-    4. Calculate daily returns
+    4. Calculate daily log returns
     5. Validate data quality (length, NaNs)
     6. Optimize weights using risk parity with Ledoit-Wolf shrinkage
     7. Execute orders to achieve target weights
@@ -355,7 +677,7 @@ def rebalance(context):
             return
 
         # Step 2: Fetch historical prices
-        # Need lookback+1 days to calculate lookback returns via pct_change()
+        # Need lookback+1 days to calculate lookback returns
         # history() is the correct API for multiple securities in backtesting
         hist_prices = history(
             count=context.lookback + 1,  # 253 days
@@ -376,38 +698,54 @@ def rebalance(context):
             log.info(f"[{current_date}] Price data has {len(hist_prices.columns)} securities, expected {len(context.securities)}. Skipping rebalance.")
             return
 
-        # Step 3: Calculate returns
-        # pct_change() drops first row, so we get exactly 252 days of returns
-        returns = hist_prices.pct_change().dropna()
+        # Reuse weights if this lookback window was already optimized
+        cache_key = (hist_prices.index[0], hist_prices.index[-1])
+        weights_array = context._cov_cache.get(cache_key)
 
-        # Step 4: Validate data quality
-        if len(returns) < context.lookback:
-            log.info(f"[{current_date}] Insufficient history: {len(returns)}/{context.lookback} days. Skipping rebalance.")
-            return
+        if weights_array is None:
+            # Step 3: Calculate log returns (float32 is ample for returns;
+            # covariance and weights are float64)
+            # Differencing drops the first row, so we get exactly 252 days of returns
+            log_prices = update_log_prices(context, hist_prices)
+            returns = np.diff(log_prices, axis=0).astype(np.float32)
 
-        if returns.isnull().any().any():
-            log.info(f"[{current_date}] NaN values in returns. Skipping rebalance.")
-            return
+            # Step 4: Validate data quality
+            if returns.shape[0] < context.lookback:
+                log.info(f"[{current_date}] Insufficient history: {returns.shape[0]}/{context.lookback} days. Skipping rebalance.")
+                return
+
+            if np.isnan(returns).any():
+                log.info(f"[{current_date}] NaN values in returns. Skipping rebalance.")
+                return
 
-        # Step 5: Optimize weights (risk parity with Ledoit-Wolf shrinkage)
-        weights_array = optimize_weights(returns, use_shrinkage=context.use_shrinkage)
-        weights_dict = dict(zip(context.securities, weights_array))
+            # Step 5: Optimize weights (risk parity with Ledoit-Wolf shrinkage)
+            weights_array = optimize_weights(returns, use_shrinkage=context.use_shrinkage)
+
+            # Bounded FIFO cache: evict the oldest window first
+            if len(context._cov_cache) >= COV_CACHE_SIZE:
+                context._cov_cache.pop(next(iter(context._cov_cache)))
+            context._cov_cache[cache_key] = weights_array
 
         # Update target weights
-        context.target_weights = weights_dict
+        context.target_weights = weights_array
 
         # Step 6: Execute orders
         # Get current portfolio value for position sizing
         portfolio_value = context.portfolio.portfolio_value
+        target_values = portfolio_value * weights_array
         successful_orders = 0
         failed_orders = []
 
-        for security, target_weight in weights_dict.items():
-            target_value = portfolio_value * target_weight
+        # Sells first (most negative value change), then buys, so that sale
+        # proceeds fund the purchases within the same bar
+        order_sequence = np.argsort(target_values - current_position_values(context))
+
+        for i in order_sequence:
+            security = context.securities[i]
 
             try:
                 # Order to target value (JoinQuant handles current position automatically)
-                order_target_value(security, target_value)
+                order_target_value(security, float(target_values[i]))
                 successful_orders += 1
             except Exception as e:
                 failed_orders.append(f"{security}: {str(e)}")
@@ -417,8 +755,8 @@ def rebalance(context):
         context.last_rebalance_date = current_date
 
         # Get top 3 weights for quick inspection
-        sorted_weights = sorted(weights_dict.items(), key=lambda x: x[1], reverse=True)
-        top_3 = ", ".join([f"{s.split('.')[0]}: {w:.1%}" for s, w in sorted_weights[:3]])
+        top_idx = np.argsort(weights_array)[::-1][:3]
+        top_3 = ", ".join([f"{context.securities[i].split('.')[0]}: {weights_array[i]:.1%}" for i in top_idx])
 
         log.info(f"[{current_date}] Rebalance #{context.rebalance_count} completed (drift: {max_drift:.2%})")
         log.info(f"  Orders: {successful_orders}/{len(context.securities)} successful")
@@ -439,20 +777,21 @@ def rebalance(context):
 
 def handle_data(context, data):
     """
-    Optional: Monitor portfolio on every bar (daily).
+    Run the weekly rebalancing check on the first trading day of each week.
 
-    This function runs on every trading day and can be used for:
-    - Daily performance monitoring
-    - Risk checks
-    - Logging
-
-    Currently: No action needed (adaptive weekly rebalancing only).
+    This function runs on every trading day at market open. Checking the
+    ISO week here replaces a separate run_weekly() schedule, so days
+    other than the first trading day of the week return immediately.
 
     Args:
         context: JoinQuant context object
         data: Current bar data for all securities
     """
-    pass
+    week = context.current_dt.isocalendar()[:2]
+
+    if week != context._last_check_week:
+        context._last_check_week = week
+        rebalance(context)
 
 
 # ==============================================================================
@@ -488,6 +827,8 @@ def handle_data(context, data):
 #    - Current position (buys/sells to reach target)
 #    - Commission calculation
 #    - Order validation
+#    Orders are submitted sells-first so sale proceeds fund the buys
+#    (JoinQuant has no order_target_percent / batch order API)
 #
 # 7. Error Handling:
 #    - Insufficient history: Skip rebalance
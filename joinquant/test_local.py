@@ -16,7 +16,10 @@ Expected Output:
     - Risk parity achieved
 """
 
+import importlib.util
 import sys
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -31,19 +34,50 @@ from src.optimizer import risk_contribution as standalone_risk_contribution
 from src.data_loader import load_prices
 
 # Import embedded optimizer from JoinQuant file
-# We'll exec the file and extract the functions
+# Loaded as a regular module so Python can reuse its cached bytecode
 joinquant_file = project_root / 'joinquant' / 'all_weather_v1_joinquant.py'
 
-# Read and execute JoinQuant file to get embedded functions
-with open(joinquant_file, 'r') as f:
-    code = f.read()
+spec = importlib.util.spec_from_file_location('all_weather_v1_joinquant', joinquant_file)
+joinquant_module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = joinquant_module
+spec.loader.exec_module(joinquant_module)
+
+embedded_optimize = joinquant_module.optimize_weights
+embedded_risk_contribution = joinquant_module.risk_contribution
+
+
+@lru_cache(maxsize=1)
+def _get_returns() -> pd.DataFrame:
+    """Load test data once: last 252 days of returns (253 prices)."""
+    prices = load_prices(str(project_root / 'data' / 'etf_prices_7etf.csv'))
+    return prices.tail(253).pct_change().dropna()
+
+
+@lru_cache(maxsize=1)
+def _get_returns_array() -> np.ndarray:
+    """Test returns as a contiguous float32 (days x assets) array."""
+    return np.ascontiguousarray(_get_returns().to_numpy(dtype=np.float32))
+
+
+@lru_cache(maxsize=1)
+def _get_cov() -> np.ndarray:
+    """Sample covariance of the test returns (computed once, ddof=1).
+
+    Formed in float32, returned as float64 for the risk contribution checks.
+    """
+    return np.cov(_get_returns_array(), rowvar=False).astype(np.float64)
+
 
-# Extract just the optimizer section (before JoinQuant strategy)
-# This is a bit hacky but works for testing
-exec_globals = {}
-exec(code, exec_globals)
-embedded_optimize = exec_globals['optimize_weights']
-embedded_risk_contribution = exec_globals['risk_contribution']
+@lru_cache(maxsize=1)
+def _get_standalone_weights() -> np.ndarray:
+    """Standalone optimizer weights for the test returns (solved once)."""
+    return standalone_optimize(_get_returns())
+
+
+@lru_cache(maxsize=1)
+def _get_embedded_weights() -> np.ndarray:
+    """Embedded optimizer weights for the test returns (solved once)."""
+    return embedded_optimize(_get_returns())
 
 
 def test_optimizer_consistency():
@@ -52,18 +86,14 @@ def test_optimizer_consistency():
     print("TEST 1: Optimizer Consistency")
     print("=" * 60)
 
-    # Load test data
-    prices = load_prices(str(project_root / 'data' / 'etf_prices_7etf.csv'))
-
-    # Use last 253 days (for 252-day returns after pct_change)
-    test_prices = prices.tail(253)
-    returns = test_prices.pct_change().dropna()
+    # Load test data (last 253 days for 252-day returns after pct_change)
+    returns = _get_returns()
 
     print(f"Test data: {len(returns)} days of returns for {len(returns.columns)} ETFs")
 
     # Calculate weights with both implementations
-    weights_standalone = standalone_optimize(returns)
-    weights_embedded = embedded_optimize(returns)
+    weights_standalone = _get_standalone_weights()
+    weights_embedded = _get_embedded_weights()
 
     # Check if weights match
     weights_match = np.allclose(weights_standalone, weights_embedded, atol=1e-6)
@@ -93,13 +123,11 @@ def test_risk_contribution():
     print("=" * 60)
 
     # Load test data
-    prices = load_prices(str(project_root / 'data' / 'etf_prices_7etf.csv'))
-    test_prices = prices.tail(253)
-    returns = test_prices.pct_change().dropna()
+    returns = _get_returns()
 
     # Get weights and covariance
-    weights = standalone_optimize(returns)
-    cov_matrix = returns.cov().values
+    weights = _get_standalone_weights()
+    cov_matrix = _get_cov()
 
     # Calculate risk contributions with both implementations
     rc_standalone = standalone_risk_contribution(weights, cov_matrix)
@@ -134,13 +162,11 @@ def test_risk_parity_achieved():
     print("=" * 60)
 
     # Load test data
-    prices = load_prices(str(project_root / 'data' / 'etf_prices_7etf.csv'))
-    test_prices = prices.tail(253)
-    returns = test_prices.pct_change().dropna()
+    returns = _get_returns()
 
     # Get weights and calculate risk contributions
-    weights = embedded_optimize(returns)
-    cov_matrix = returns.cov().values
+    weights = _get_embedded_weights()
+    cov_matrix = _get_cov()
     risk_contribs = embedded_risk_contribution(weights, cov_matrix)
 
     # Check if risk parity is achieved (std dev of risk contributions < 0.01)
@@ -169,13 +195,8 @@ def test_weights_sum_to_one():
     print("TEST 4: Weights Sum to 1.0")
     print("=" * 60)
 
-    # Load test data
-    prices = load_prices(str(project_root / 'data' / 'etf_prices_7etf.csv'))
-    test_prices = prices.tail(253)
-    returns = test_prices.pct_change().dropna()
-
     # Get weights
-    weights = embedded_optimize(returns)
+    weights = _get_embedded_weights()
     weights_sum = np.sum(weights)
 
     print(f"Weights sum: {weights_sum:.10f}")
@@ -39,53 +39,30 @@ portfolio_history = results['portfolio_history']
 print("\nCalculating asset profit contributions...")
 print("=" * 80)
 
-asset_profits = {}
-asset_weights_avg = {}
+# Position values and asset returns as (days x assets) arrays
+assets = list(prices.columns)
+asset_values = portfolio_history[[f'{asset}_value' for asset in assets]].to_numpy(dtype=np.float64)
+portfolio_values = portfolio_history['portfolio_value'].to_numpy(dtype=np.float64)
 
-for asset in prices.columns:
-    # Get position values over time for this asset
-    asset_values = portfolio_history[f'{asset}_value']
+# Daily returns aligned with portfolio history dates
+asset_returns = prices.pct_change().reindex(portfolio_history.index).to_numpy(dtype=np.float64)
 
-    # Calculate profit: final value - total invested
-    # We need to track the cumulative investment in each asset
-    # For simplicity, we'll use the change in position value
+# Daily profit = previous day's position value * daily return
+# (this accounts for capital added/removed during rebalancing)
+daily_profits = np.nan_to_num(asset_values[:-1] * asset_returns[1:])
 
-    # Initial value (first non-zero value)
-    first_value = asset_values[asset_values > 0].iloc[0] if (asset_values > 0).any() else 0
-    final_value = asset_values.iloc[-1]
-
-    # Profit is the difference between final and initial values
-    # But this doesn't account for capital added/removed during rebalancing
-    # Better approach: calculate daily returns and multiply by daily position values
-
-    # Get daily returns for this asset
-    asset_returns = prices[asset].pct_change()
-
-    # Align with portfolio history dates
-    asset_returns = asset_returns.reindex(portfolio_history.index)
-
-    # Daily profit = position value * daily return
-    daily_profits = asset_values.shift(1) * asset_returns
-
-    # Total profit from this asset
-    total_profit = daily_profits.sum()
-
-    asset_profits[asset] = total_profit
-
-    # Calculate average weight
-    portfolio_values = portfolio_history['portfolio_value']
-    asset_weights = asset_values / portfolio_values
-    avg_weight = asset_weights.mean()
-    asset_weights_avg[asset] = avg_weight
+# Total profit and average weight per asset in one reduction each
+total_profits = daily_profits.sum(axis=0)
+avg_weights = (asset_values / portfolio_values[:, None]).mean(axis=0)
 
 # Convert to DataFrame for better display
 profit_df = pd.DataFrame({
-    'Asset': list(asset_profits.keys()),
-    'Profit (¥)': list(asset_profits.values()),
-    'Avg Weight': list(asset_weights_avg.values())
+    'Asset': assets,
+    'Profit (¥)': total_profits,
+    'Avg Weight': avg_weights
 })
 
-# Add asset names
+# Asset names and classes
 asset_names = {
     '510300.SH': 'CSI 300 (Large-cap)',
     '510500.SH': 'CSI 500 (Mid-cap)',
@@ -95,17 +72,6 @@ asset_names = {
     '000066.SH': 'China Bond',
     '513100.SH': 'Nasdaq-100'
 }
-
-profit_df['Name'] = profit_df['Asset'].map(asset_names)
-
-# Calculate profit percentage
-total_profit = results['metrics']['final_value'] - results['metrics']['initial_capital']
-profit_df['Profit %'] = (profit_df['Profit (¥)'] / total_profit * 100)
-
-# Sort by profit
-profit_df = profit_df.sort_values('Profit (¥)', ascending=False)
-
-# Add asset class
 asset_classes = {
     '510300.SH': 'Stock',
     '510500.SH': 'Stock',
@@ -115,7 +81,23 @@ asset_classes = {
     '000066.SH': 'Bond',
     '513100.SH': 'Stock'
 }
-profit_df['Class'] = profit_df['Asset'].map(asset_classes)
+
+# Encode tickers once as category codes; both labels are then a single
+# array gather. Unknown tickers get code -1, which picks the trailing NaN slot
+# (get_indexer instead of pd.Categorical, which deprecates unknown values).
+asset_codes = pd.Index(list(asset_names)).get_indexer(profit_df['Asset'])
+name_lookup = np.array(list(asset_names.values()) + [np.nan], dtype=object)
+class_lookup = np.array([asset_classes[asset] for asset in asset_names] + [np.nan], dtype=object)
+
+profit_df['Name'] = name_lookup[asset_codes]
+profit_df['Class'] = class_lookup[asset_codes]
+
+# Calculate profit percentage
+total_profit = results['metrics']['final_value'] - results['metrics']['initial_capital']
+profit_df['Profit %'] = (profit_df['Profit (¥)'] / total_profit * 100)
+
+# Sort by profit
+profit_df = profit_df.sort_values('Profit (¥)', ascending=False)
 
 # Display results
 print("\nPROFIT CONTRIBUTION BY ASSET (v1.2, 2018-2026)")
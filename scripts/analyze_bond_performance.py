@@ -4,6 +4,7 @@ Analyze bond performance and rate environment during 2018-2026.
 Shows how interest rate cuts (降息) drove bond returns.
 """
 
+import argparse
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,103 +13,11 @@ import pandas as pd
 import numpy as np
 from src.data_loader import load_prices
 
-# Load data
-print("Loading data...")
-prices = load_prices('data/etf_prices_7etf.csv')
-
-# Focus on bond ETFs
-bond_etfs = {
-    '511260.SH': '10Y Treasury (Chinese Gov Bond)',
-    '000066.SH': 'China Bond Index'
-}
-
-# Calculate cumulative returns
-start_date = '2018-01-01'
-bond_prices = prices[list(bond_etfs.keys())].loc[start_date:]
-
-# Calculate cumulative returns (normalize to 100)
-cumulative_returns = (bond_prices / bond_prices.iloc[0]) * 100
-
-# Calculate annual returns by year
-yearly_returns = {}
-for year in range(2018, 2027):
-    year_start = f'{year}-01-01'
-    year_end = f'{year}-12-31'
-
-    if year == 2026:
-        year_end = bond_prices.index[-1].strftime('%Y-%m-%d')
-
-    try:
-        year_prices = bond_prices.loc[year_start:year_end]
-        if len(year_prices) > 0:
-            start_price = year_prices.iloc[0]
-            end_price = year_prices.iloc[-1]
-            year_return = (end_price / start_price - 1) * 100
-            yearly_returns[year] = year_return
-    except:
-        pass
-
-print("\n" + "=" * 80)
-print("CHINESE BOND ETF PERFORMANCE (2018-2026)")
-print("=" * 80)
-
-print("\n1. CUMULATIVE RETURNS (2018-2026)")
-print("-" * 80)
-for etf, name in bond_etfs.items():
-    total_return = (bond_prices[etf].iloc[-1] / bond_prices[etf].iloc[0] - 1) * 100
-    annualized = ((1 + total_return/100) ** (1/8) - 1) * 100
-    print(f"{name:40} Total: {total_return:>7.1f}%  |  Annualized: {annualized:>5.2f}%")
-
-print("\n" + "=" * 80)
-print("2. ANNUAL RETURNS BY YEAR")
-print("=" * 80)
-
-# Create table header
-print(f"{'Year':<10}", end='')
-for etf, name in bond_etfs.items():
-    print(f"{name[:25]:>27}", end='')
-print()
-print("-" * 80)
-
-# Print yearly returns
-for year in sorted(yearly_returns.keys()):
-    print(f"{year:<10}", end='')
-    for etf in bond_etfs.keys():
-        if etf in yearly_returns[year]:
-            ret = yearly_returns[year][etf]
-            print(f"{ret:>26.2f}%", end='')
-    print()
-
-print("=" * 80)
-
-# Key periods analysis
-print("\n3. KEY PERIODS & RATE POLICY")
-print("=" * 80)
-
-periods = {
-    '2018-2019 (Trade War)': ('2018-01-01', '2019-12-31'),
-    '2020 (COVID-19)': ('2020-01-01', '2020-12-31'),
-    '2021-2022 (Recovery)': ('2021-01-01', '2022-12-31'),
-    '2023-2024 (Stimulus)': ('2023-01-01', '2024-12-31'),
-    '2025-2026 (Easing)': ('2025-01-01', bond_prices.index[-1].strftime('%Y-%m-%d'))
-}
-
-for period_name, (start, end) in periods.items():
-    try:
-        period_prices = bond_prices.loc[start:end]
-        if len(period_prices) > 1:
-            print(f"\n{period_name}:")
-            for etf, name in bond_etfs.items():
-                period_return = (period_prices[etf].iloc[-1] / period_prices[etf].iloc[0] - 1) * 100
-                print(f"  {name:40} {period_return:>7.2f}%")
-    except:
-        pass
-
-print("\n" + "=" * 80)
-print("4. INTEREST RATE ENVIRONMENT (降息 = Rate Cuts)")
-print("=" * 80)
-
-rate_timeline = """
+# Display-only ratios: float32 prices are precise enough and half the size
+USE_FLOAT32 = True
+
+# Static report sections
+RATE_TIMELINE = """
 2018: Stable rates, trade war begins
 2019: PBOC introduces LPR reform (new benchmark)
 
@@ -149,13 +58,7 @@ TOTAL RATE DECLINE (2019-2025):
 - 10Y yield: ~3.3% (2018) → 1.82% (2026) (-1.48%)
 """
 
-print(rate_timeline)
-
-print("\n" + "=" * 80)
-print("5. WHY BONDS PERFORMED SO WELL")
-print("=" * 80)
-
-explanation = """
+EXPLANATION = """
 INVERSE RELATIONSHIP: Bond Prices ↑ when Interest Rates ↓
 
 When PBOC cuts rates (降息):
@@ -180,11 +83,123 @@ This is why bonds in the All Weather portfolio had:
 - China Bond: 114.4% return (longer duration = higher sensitivity)
 """
 
-print(explanation)
 
-print("=" * 80)
-print("\nSOURCES:")
-print("- PBOC Monetary Policy Reports")
-print("- China 10Y Government Bond Yield (TradingEconomics)")
-print("- Federal Reserve FOMC Statements")
-print("=" * 80)
+def main(start_date='2018-01-01'):
+    """
+    Print the Chinese bond performance report.
+
+    Args:
+        start_date: First day of the analysis window (YYYY-MM-DD)
+    """
+    # Load data
+    print("Loading data...")
+    prices = load_prices('data/etf_prices_7etf.csv')
+    if USE_FLOAT32:
+        prices = prices.astype(np.float32)
+
+    # Focus on bond ETFs
+    bond_etfs = {
+        '511260.SH': '10Y Treasury (Chinese Gov Bond)',
+        '000066.SH': 'China Bond Index'
+    }
+
+    # Calculate cumulative returns
+    bond_prices = prices.loc[pd.Timestamp(start_date):, list(bond_etfs)]
+    first_year, last_year = bond_prices.index[0].year, bond_prices.index[-1].year
+    n_years = max(last_year - first_year, 1)
+
+    # Calculate cumulative returns (normalize to 100)
+    cumulative_returns = (bond_prices / bond_prices.iloc[0]) * 100
+
+    # Calculate annual returns by year (first/last close of each calendar year)
+    yearly_prices = bond_prices.resample('YE').agg(['first', 'last'])
+    yearly_returns = (yearly_prices.xs('last', axis=1, level=1)
+                      / yearly_prices.xs('first', axis=1, level=1) - 1) * 100
+    yearly_returns = yearly_returns.dropna(how='all')
+    yearly_returns.index = yearly_returns.index.year
+
+    print("\n" + "=" * 80)
+    print(f"CHINESE BOND ETF PERFORMANCE ({first_year}-{last_year})")
+    print("=" * 80)
+
+    print(f"\n1. CUMULATIVE RETURNS ({first_year}-{last_year})")
+    print("-" * 80)
+    total_returns = (bond_prices.iloc[-1] / bond_prices.iloc[0] - 1) * 100
+    cumulative_table = pd.DataFrame({
+        'Total %': total_returns,
+        'Annualized %': ((1 + total_returns / 100) ** (1/n_years) - 1) * 100,
+    }).loc[list(bond_etfs)].rename(index=bond_etfs)
+    print(cumulative_table.to_string(
+        index_names=False,
+        formatters={'Total %': '{:.1f}'.format, 'Annualized %': '{:.2f}'.format}
+    ))
+
+    print("\n" + "=" * 80)
+    print("2. ANNUAL RETURNS BY YEAR")
+    print("=" * 80)
+
+    # One formatted write for the whole table
+    yearly_table = yearly_returns[list(bond_etfs)].rename(columns={etf: name[:25] for etf, name in bond_etfs.items()})
+    yearly_table.columns.name = 'Year (%)'
+    yearly_table.index.name = None
+    print(yearly_table.to_string(float_format='{:.2f}'.format))
+
+    print("=" * 80)
+
+    # Key periods analysis
+    print("\n3. KEY PERIODS & RATE POLICY")
+    print("=" * 80)
+
+    period_names = [
+        '2018-2019 (Trade War)',
+        '2020 (COVID-19)',
+        '2021-2022 (Recovery)',
+        '2023-2024 (Stimulus)',
+        '2025-2026 (Easing)',
+    ]
+    period_starts = pd.to_datetime(['2018-01-01', '2020-01-01', '2021-01-01', '2023-01-01', '2025-01-01'])
+
+    # Periods are back to back: each ends the row before the next one starts
+    start_idx = bond_prices.index.searchsorted(period_starts, side='left')
+    end_idx = np.append(start_idx[1:], len(bond_prices)) - 1
+
+    # (n_periods x n_bonds) returns from two row gathers
+    price_arr = bond_prices.to_numpy()
+    valid = end_idx > start_idx
+    period_returns = np.full((len(period_names), len(bond_etfs)), np.nan)
+    period_returns[valid] = (price_arr[end_idx[valid]] / price_arr[start_idx[valid]] - 1) * 100
+
+    for period_name, is_valid, returns_row in zip(period_names, valid, period_returns):
+        if not is_valid:
+            continue
+        print(f"\n{period_name}:")
+        for name, period_return in zip(bond_etfs.values(), returns_row):
+            print(f"  {name:40} {period_return:>7.2f}%")
+
+    print("\n" + "=" * 80)
+    print("4. INTEREST RATE ENVIRONMENT (降息 = Rate Cuts)")
+    print("=" * 80)
+
+    print(RATE_TIMELINE)
+
+    print("\n" + "=" * 80)
+    print("5. WHY BONDS PERFORMED SO WELL")
+    print("=" * 80)
+
+    print(EXPLANATION)
+
+    print("=" * 80)
+    print("\nSOURCES:")
+    print("- PBOC Monetary Policy Reports")
+    print("- China 10Y Government Bond Yield (TradingEconomics)")
+    print("- Federal Reserve FOMC Statements")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start-date', default='2018-01-01',
+                        help='first day of the analysis window (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    main(start_date=args.start_date)
@@ -4,6 +4,7 @@ Analyze US market performance and Federal Reserve rate environment (2018-2026).
 Shows how Fed policy affected S&P 500 and Nasdaq-100 returns in the portfolio.
 """
 
+import argparse
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,114 +13,11 @@ import pandas as pd
 import numpy as np
 from src.data_loader import load_prices
 
-# Load data
-print("Loading data...")
-prices = load_prices('data/etf_prices_7etf.csv')
-
-# Focus on US market ETFs
-us_etfs = {
-    '513500.SH': 'S&P 500 ETF',
-    '513100.SH': 'Nasdaq-100 ETF'
-}
-
-# Also include Chinese stocks for comparison
-cn_etfs = {
-    '510300.SH': 'CSI 300 (China Large-cap)',
-    '510500.SH': 'CSI 500 (China Mid-cap)'
-}
-
-all_stocks = {**us_etfs, **cn_etfs}
-
-# Calculate cumulative returns
-start_date = '2018-01-01'
-stock_prices = prices[list(all_stocks.keys())].loc[start_date:]
-
-# Calculate annual returns by year
-yearly_returns = {}
-for year in range(2018, 2027):
-    year_start = f'{year}-01-01'
-    year_end = f'{year}-12-31'
-
-    if year == 2026:
-        year_end = stock_prices.index[-1].strftime('%Y-%m-%d')
-
-    try:
-        year_prices = stock_prices.loc[year_start:year_end]
-        if len(year_prices) > 0:
-            start_price = year_prices.iloc[0]
-            end_price = year_prices.iloc[-1]
-            year_return = (end_price / start_price - 1) * 100
-            yearly_returns[year] = year_return
-    except:
-        pass
-
-print("\n" + "=" * 100)
-print("US vs CHINA STOCK MARKET PERFORMANCE (2018-2026)")
-print("=" * 100)
-
-print("\n1. CUMULATIVE RETURNS (2018-2026)")
-print("-" * 100)
-print(f"{'ETF':<30}{'Total Return':>15}{'Annualized':>15}{'Asset Type':>20}")
-print("-" * 100)
-
-for etf, name in all_stocks.items():
-    total_return = (stock_prices[etf].iloc[-1] / stock_prices[etf].iloc[0] - 1) * 100
-    annualized = ((1 + total_return/100) ** (1/8) - 1) * 100
-    asset_type = "US Stock" if etf in us_etfs else "China Stock"
-    print(f"{name:<30}{total_return:>14.1f}%{annualized:>14.2f}%{asset_type:>20}")
-
-print("\n" + "=" * 100)
-print("2. ANNUAL RETURNS BY YEAR")
-print("=" * 100)
-
-# Create table header
-print(f"{'Year':<10}", end='')
-for name in all_stocks.values():
-    print(f"{name[:20]:>22}", end='')
-print()
-print("-" * 100)
-
-# Print yearly returns
-for year in sorted(yearly_returns.keys()):
-    print(f"{year:<10}", end='')
-    for etf in all_stocks.keys():
-        if etf in yearly_returns[year]:
-            ret = yearly_returns[year][etf]
-            print(f"{ret:>21.1f}%", end='')
-    print()
-
-print("=" * 100)
-
-# Key periods analysis
-print("\n3. KEY PERIODS & FED POLICY")
-print("=" * 100)
-
-periods = {
-    '2018 (Rate Hikes)': ('2018-01-01', '2018-12-31'),
-    '2019 (Rate Cuts)': ('2019-01-01', '2019-12-31'),
-    '2020 (COVID Crash + Recovery)': ('2020-01-01', '2020-12-31'),
-    '2021-2022 (Inflation + Hikes)': ('2021-01-01', '2022-12-31'),
-    '2023-2024 (Peak Rates + AI Boom)': ('2023-01-01', '2024-12-31'),
-    '2025-2026 (Rate Cuts Resume)': ('2025-01-01', stock_prices.index[-1].strftime('%Y-%m-%d'))
-}
-
-for period_name, (start, end) in periods.items():
-    try:
-        period_prices = stock_prices.loc[start:end]
-        if len(period_prices) > 1:
-            print(f"\n{period_name}:")
-            for etf, name in all_stocks.items():
-                period_return = (period_prices[etf].iloc[-1] / period_prices[etf].iloc[0] - 1) * 100
-                asset_type = "US" if etf in us_etfs else "CN"
-                print(f"  [{asset_type}] {name:<35} {period_return:>8.2f}%")
-    except:
-        pass
-
-print("\n" + "=" * 100)
-print("4. FEDERAL RESERVE INTEREST RATE TIMELINE")
-print("=" * 100)
-
-fed_timeline = """
+# Display-only ratios: float32 prices are precise enough and half the size
+USE_FLOAT32 = True
+
+# Static report sections
+FED_TIMELINE = """
 2018: RATE HIKES (加息)
       - 4 rate hikes throughout year
       - Fed Funds Rate: 1.25-1.5% → 2.25-2.5%
@@ -172,13 +70,7 @@ TOTAL FED FUNDS RATE JOURNEY:
 2026: 3.75% (normalized)
 """
 
-print(fed_timeline)
-
-print("\n" + "=" * 100)
-print("5. WHY US STOCKS CRUSHED CHINA STOCKS")
-print("=" * 100)
-
-comparison = """
+COMPARISON = """
 US MARKET OUTPERFORMANCE:
 ┌─────────────────┬──────────────┬──────────────┬─────────────┐
 │                 │ S&P 500      │ Nasdaq-100   │ Advantage   │
@@ -248,12 +140,7 @@ But this SAVED the portfolio in 2022 when Nasdaq crashed -33%:
 This is Ray Dalio's genius: Cap downside, capture upside.
 """
 
-print(comparison)
-
-print("=" * 100)
-print("\nBOTTOM LINE:")
-print("=" * 100)
-print("""
+BOTTOM_LINE = """
 US stocks (especially Nasdaq) were the PROFIT CHAMPIONS:
 - Nasdaq-100: ¥226,187 profit (19% of total) with only 6.9% weight
 - S&P 500: ¥171,139 profit (14% of total) with 8.6% weight
@@ -264,6 +151,142 @@ AI boom (2023-2024) drove Nasdaq to +327% total return.
 Risk parity kept allocation low to protect against volatility.
 
 The strategy worked: Capture growth, limit drawdowns.
-""")
+"""
+
 
-print("=" * 100)
+def main(start_date='2018-01-01'):
+    """
+    Print the US vs China stock performance report.
+
+    Args:
+        start_date: First day of the analysis window (YYYY-MM-DD)
+    """
+    # Load data
+    print("Loading data...")
+    prices = load_prices('data/etf_prices_7etf.csv')
+    if USE_FLOAT32:
+        prices = prices.astype(np.float32)
+
+    # Focus on US market ETFs
+    us_etfs = {
+        '513500.SH': 'S&P 500 ETF',
+        '513100.SH': 'Nasdaq-100 ETF'
+    }
+
+    # Also include Chinese stocks for comparison
+    cn_etfs = {
+        '510300.SH': 'CSI 300 (China Large-cap)',
+        '510500.SH': 'CSI 500 (China Mid-cap)'
+    }
+
+    all_stocks = {**us_etfs, **cn_etfs}
+
+    # Calculate cumulative returns
+    start_date = pd.Timestamp(start_date)
+    stock_prices = prices.loc[start_date:, list(all_stocks)]
+    first_year, last_year = stock_prices.index[0].year, stock_prices.index[-1].year
+    n_years = max(last_year - first_year, 1)
+
+    # Calculate annual returns by year (first/last close of each calendar year)
+    yearly_prices = stock_prices.groupby(stock_prices.index.year).agg(['first', 'last'])
+    yearly_returns_df = (yearly_prices.xs('last', axis=1, level=1)
+                         / yearly_prices.xs('first', axis=1, level=1) - 1) * 100
+
+    # Sections 1-3 are collected as lines and written out once
+    lines = [
+        "\n" + "=" * 100,
+        f"US vs CHINA STOCK MARKET PERFORMANCE ({first_year}-{last_year})",
+        "=" * 100,
+        f"\n1. CUMULATIVE RETURNS ({first_year}-{last_year})",
+        "-" * 100,
+        f"{'ETF':<30}{'Total Return':>15}{'Annualized':>15}{'Asset Type':>20}",
+        "-" * 100,
+    ]
+
+    # Total and annualized returns for all ETFs at once
+    total_returns = (stock_prices.iloc[-1] / stock_prices.iloc[0] - 1) * 100
+    annualized_returns = ((1 + total_returns / 100) ** (1/n_years) - 1) * 100
+
+    for (etf, name), total_return, annualized in zip(all_stocks.items(), total_returns, annualized_returns):
+        asset_type = "US Stock" if etf in us_etfs else "China Stock"
+        lines.append(f"{name:<30}{total_return:>14.1f}%{annualized:>14.2f}%{asset_type:>20}")
+
+    lines += [
+        "\n" + "=" * 100,
+        "2. ANNUAL RETURNS BY YEAR",
+        "=" * 100,
+    ]
+
+    # Table header and one row per year
+    lines.append(f"{'Year':<10}" + "".join(f"{name[:20]:>22}" for name in all_stocks.values()))
+    lines.append("-" * 100)
+    for year, row in zip(yearly_returns_df.index, yearly_returns_df[list(all_stocks)].to_numpy()):
+        lines.append(f"{year:<10}" + "".join(f"{value:>21.1f}%" for value in row))
+
+    lines.append("=" * 100)
+
+    # Key periods analysis
+    lines += [
+        "\n3. KEY PERIODS & FED POLICY",
+        "=" * 100,
+    ]
+
+    periods = {
+        '2018 (Rate Hikes)': ('2018-01-01', '2018-12-31'),
+        '2019 (Rate Cuts)': ('2019-01-01', '2019-12-31'),
+        '2020 (COVID Crash + Recovery)': ('2020-01-01', '2020-12-31'),
+        '2021-2022 (Inflation + Hikes)': ('2021-01-01', '2022-12-31'),
+        '2023-2024 (Peak Rates + AI Boom)': ('2023-01-01', '2024-12-31'),
+        '2025-2026 (Rate Cuts Resume)': ('2025-01-01', stock_prices.index[-1])
+    }
+
+    # Parse the bounds once (the open end is already a Timestamp), then find the
+    # integer bounds for every period in one searchsorted pass each
+    period_starts = pd.DatetimeIndex([start for start, _ in periods.values()])
+    period_ends = pd.DatetimeIndex([end for _, end in periods.values()])
+    start_idx = stock_prices.index.searchsorted(period_starts, side='left')
+    end_idx = stock_prices.index.searchsorted(period_ends, side='right') - 1
+
+    # (n_periods x n_assets) returns from two row gathers
+    price_arr = stock_prices.to_numpy()
+    valid = end_idx > start_idx
+    period_returns = np.full((len(periods), len(all_stocks)), np.nan)
+    period_returns[valid] = (price_arr[end_idx[valid]] / price_arr[start_idx[valid]] - 1) * 100
+
+    for period_name, is_valid, returns_row in zip(periods, valid, period_returns):
+        if not is_valid:
+            continue
+        lines.append(f"\n{period_name}:")
+        for (etf, name), period_return in zip(all_stocks.items(), returns_row):
+            asset_type = "US" if etf in us_etfs else "CN"
+            lines.append(f"  [{asset_type}] {name:<35} {period_return:>8.2f}%")
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    print("\n" + "=" * 100)
+    print("4. FEDERAL RESERVE INTEREST RATE TIMELINE")
+    print("=" * 100)
+
+    print(FED_TIMELINE)
+
+    print("\n" + "=" * 100)
+    print("5. WHY US STOCKS CRUSHED CHINA STOCKS")
+    print("=" * 100)
+
+    print(COMPARISON)
+
+    print("=" * 100)
+    print("\nBOTTOM LINE:")
+    print("=" * 100)
+    print(BOTTOM_LINE)
+
+    print("=" * 100)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start-date', default='2018-01-01',
+                        help='first day of the analysis window (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    main(start_date=args.start_date)
@@ -4,10 +4,9 @@
 import sys
 from pathlib import Path
 
-import pandas as pd
-
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.data_loader import load_prices
 from src.strategy_v2 import AllWeatherV2
 
 
@@ -53,8 +52,7 @@ class AllWeatherV2Asymmetric(AllWeatherV2):
 
 
 def main():
-    prices = pd.read_csv('data/etf_prices_7etf.csv', index_col=0, parse_dates=True)
-    prices = prices[TRADABLE_ETFS]
+    prices = load_prices('data/etf_prices_7etf.csv', columns=TRADABLE_ETFS)
 
     # Symmetric 3%
     s1 = AllWeatherV2(
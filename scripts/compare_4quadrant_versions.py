@@ -10,32 +10,66 @@ Tests 4 versions to reduce max drawdown below -10%:
 Goal: Achieve max drawdown < -10% while maintaining positive returns.
 """
 
+import argparse
 import sys
 sys.path.append('.')
 
+import hashlib
+import time
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from joblib import Parallel, delayed
 from src.data_loader_us import download_us_etfs, get_all_weather_us_etfs
-from src.strategy_us import AllWeatherUS, AllWeatherConstrainedUS, AllWeather4QuadrantUS
-from src.metrics import calculate_all_metrics
-
-# Plotting style
-plt.style.use('seaborn-v0_8-darkgrid')
-plt.rcParams['figure.figsize'] = (14, 10)
-
-
-def load_data():
-    """Load US ETF data."""
+from src.strategy_us import (
+    AllWeatherUS,
+    AllWeatherConstrainedUS,
+    AllWeather4QuadrantUS,
+    rolling_covariances,
+)
+from src.metrics import calculate_all_metrics, running_drawdown
+from src.utils.backtest_cache import cached_result, prices_cache_key
+
+# Seconds a downloaded price panel is reused before fetching again
+DOWNLOAD_CACHE_TTL = 24 * 60 * 60
+
+
+def load_data(start_date='2015-01-01'):
+    """
+    Load US ETF data.
+
+    Downloads are kept as a Parquet file under data/, keyed on the tickers and
+    start date, and reused for a day (end-of-day prices) before re-downloading.
+    """
     print("Loading US ETF data...")
     etf_info = get_all_weather_us_etfs()
     tickers = list(etf_info.keys())
 
-    prices = download_us_etfs(
-        tickers=tickers,
-        start_date='2015-01-01',
-        progress=False
-    )
+    tickers_key = hashlib.blake2b(','.join(sorted(tickers)).encode(), digest_size=8).hexdigest()
+    cache_path = Path(f'data/us_etf_{tickers_key}_{start_date}.parquet')
+
+    prices = None
+    try:
+        if cache_path.exists() and time.time() - cache_path.stat().st_mtime < DOWNLOAD_CACHE_TTL:
+            prices = pd.read_parquet(cache_path, engine='pyarrow')
+            print(f"  (cached: {cache_path})")
+    except ImportError:
+        pass
+
+    if prices is None:
+        prices = download_us_etfs(
+            tickers=tickers,
+            start_date=start_date,
+            progress=False
+        )
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            prices.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+        except (ImportError, OSError):
+            # No pyarrow or read-only data directory: download again next run
+            pass
 
     print(f"✓ Loaded {len(prices)} days of data ({len(prices.columns)} ETFs)")
     print(f"  Period: {prices.index[0].date()} to {prices.index[-1].date()}\n")
@@ -43,32 +77,48 @@ def load_data():
     return prices
 
 
-def run_version(name, strategy, start_date='2018-01-01'):
-    """Run backtest for a strategy version."""
-    print(f"\n{'='*70}")
-    print(f"Running {name}...")
-    print(f"{'='*70}")
+def cached_backtest(strategy, prices_key, start_date):
+    """
+    Run strategy.run_backtest, reusing a pickled result from an identical run.
+
+    The cache file is keyed on the strategy class, the price panel hash, every
+    parameter that affects the backtest and the src/ code version, so any
+    change reruns it.
+    """
+    params = (
+        start_date,
+        strategy.initial_capital,
+        strategy.rebalance_freq,
+        strategy.lookback,
+        strategy.commission_rate,
+        strategy.target_volatility,
+        getattr(strategy, 'constraints', None),
+    )
 
-    results = strategy.run_backtest(start_date=start_date)
+    return cached_result(
+        type(strategy).__name__, prices_key, params,
+        lambda: strategy.run_backtest(start_date=start_date),
+        verbose=True
+    )
+
+
+def run_version(name, strategy, prices_key, start_date='2018-01-01'):
+    """
+    Run backtest for a strategy version.
+
+    Top-level so joblib workers can pickle it; printing is left to
+    print_version in the parent so reports come out in version order.
+    """
+    results = cached_backtest(strategy, prices_key, start_date)
 
     # Calculate metrics
     equity = results['equity_curve']
     returns = results['returns']
     metrics = results['metrics']
 
-    # Calculate drawdown
-    running_max = equity.expanding().max()
-    drawdown = (equity - running_max) / running_max
-    max_dd = drawdown.min()
-
-    print(f"\nResults for {name}:")
-    print(f"  Final Value: ${results['final_value']:,.0f}")
-    print(f"  Total Return: {results['total_return']:.2%}")
-    print(f"  Annual Return: {metrics['annual_return']:.2%}")
-    print(f"  Annual Volatility: {metrics['annual_volatility']:.2%}")
-    print(f"  Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
-    print(f"  Max Drawdown: {max_dd:.2%}")
-    print(f"  Calmar Ratio: {metrics['calmar_ratio']:.2f}")
+    # Calculate drawdown (one pass over the curve)
+    drawdown, max_dd = running_drawdown(equity)
+    drawdown = pd.Series(drawdown, index=equity.index)
 
     return {
         'name': name,
@@ -89,42 +139,84 @@ def run_version(name, strategy, start_date='2018-01-01'):
     }
 
 
+def print_version(result):
+    """Print the summary of one version's backtest."""
+    name = result['name']
+    print(f"\n{'='*70}")
+    print(f"Running {name}...")
+    print(f"{'='*70}")
+
+    print(f"\nResults for {name}:")
+    print(f"  Final Value: ${result['final_value']:,.0f}")
+    print(f"  Total Return: {result['total_return']:.2%}")
+    print(f"  Annual Return: {result['annual_return']:.2%}")
+    print(f"  Annual Volatility: {result['annual_volatility']:.2%}")
+    print(f"  Sharpe Ratio: {result['sharpe_ratio']:.2f}")
+    print(f"  Max Drawdown: {result['max_drawdown']:.2%}")
+    print(f"  Calmar Ratio: {result['calmar_ratio']:.2f}")
+
+
+# Comparison table rows: (label, result key, display format)
+COMPARISON_ROWS = [
+    ('Final Value', 'final_value', '${:,.0f}'),
+    ('Total Return', 'total_return', '{:.2%}'),
+    ('Annual Return', 'annual_return', '{:.2%}'),
+    ('Annual Volatility', 'annual_volatility', '{:.2%}'),
+    ('Sharpe Ratio', 'sharpe_ratio', '{:.2f}'),
+    ('Sortino Ratio', 'sortino_ratio', '{:.2f}'),
+    ('Max Drawdown', 'max_drawdown', '{:.2%}'),
+    ('Calmar Ratio', 'calmar_ratio', '{:.2f}'),
+    ('Win Rate', 'win_rate', '{:.2%}'),
+    ('Rebalances', 'rebalance_count', '{:.0f}'),
+    ('Total Commissions', 'total_commissions', '${:,.0f}'),
+]
+
+
 def create_comparison_table(results_list):
-    """Create comparison table."""
-    comparison = pd.DataFrame({
-        result['name']: [
-            f"${result['final_value']:,.0f}",
-            f"{result['total_return']:.2%}",
-            f"{result['annual_return']:.2%}",
-            f"{result['annual_volatility']:.2%}",
-            f"{result['sharpe_ratio']:.2f}",
-            f"{result['sortino_ratio']:.2f}",
-            f"{result['max_drawdown']:.2%}",
-            f"{result['calmar_ratio']:.2f}",
-            f"{result['win_rate']:.2%}",
-            f"{result['rebalance_count']}",
-            f"${result['total_commissions']:,.0f}"
-        ]
-        for result in results_list
-    }, index=[
-        'Final Value',
-        'Total Return',
-        'Annual Return',
-        'Annual Volatility',
-        'Sharpe Ratio',
-        'Sortino Ratio',
-        'Max Drawdown',
-        'Calmar Ratio',
-        'Win Rate',
-        'Rebalances',
-        'Total Commissions'
-    ])
-
-    return comparison
-
-
-def plot_comparison(results_list):
-    """Plot comparison charts."""
+    """Create comparison table (numeric; see format_comparison_table for display)."""
+    values = np.array(
+        [[result[key] for _, key, _ in COMPARISON_ROWS] for result in results_list],
+        dtype=np.float64
+    )
+
+    return pd.DataFrame(
+        values.T,
+        index=[label for label, _, _ in COMPARISON_ROWS],
+        columns=[result['name'] for result in results_list]
+    )
+
+
+def format_comparison_table(comparison):
+    """Render the numeric comparison table with per-row display formats."""
+    formatted = pd.DataFrame(
+        [[fmt.format(value) for value in row]
+         for (_, _, fmt), row in zip(COMPARISON_ROWS, comparison.to_numpy())],
+        index=comparison.index,
+        columns=comparison.columns
+    )
+
+    return formatted.to_string()
+
+
+def plot_comparison(results_list, show=False):
+    """
+    Plot comparison charts.
+
+    Args:
+        results_list: Version results from run_version
+        show: Open the figure window after saving; otherwise render
+              straight to the PNG with the non-interactive Agg backend
+    """
+    # Imported here so runs without plots skip the matplotlib startup cost
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Plotting style
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.rcParams['figure.figsize'] = (14, 10)
+
     fig, axes = plt.subplots(3, 2, figsize=(16, 12))
 
     # 1. Equity curves
@@ -217,11 +309,19 @@ def plot_comparison(results_list):
     plt.tight_layout()
     plt.savefig('results/4quadrant_comparison.png', dpi=300, bbox_inches='tight')
     print("\n✓ Saved comparison chart to results/4quadrant_comparison.png")
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
-def main():
-    """Main comparison workflow."""
+def main(plot=True, show=False):
+    """
+    Main comparison workflow.
+
+    Args:
+        plot: Draw and save the comparison charts (False skips matplotlib)
+        show: Also display the charts interactively
+    """
     print("="*70)
     print("ALL WEATHER STRATEGY - 4-QUADRANT COMPARISON")
     print("="*70)
@@ -229,6 +329,11 @@ def main():
 
     # Load data
     prices = load_data()
+    prices_key = prices_cache_key(prices)
+
+    # All versions share the price panel and 252-day lookback, so they share
+    # one rolling covariance estimate and differ only in the optimizer
+    rolling_cov = rolling_covariances(prices, lookback=252)
 
     # Initialize strategies
     v1_1 = AllWeatherUS(
@@ -237,7 +342,8 @@ def main():
         rebalance_freq='W-MON',
         lookback=252,
         commission_rate=0.001,
-        target_volatility=None
+        target_volatility=None,
+        rolling_cov=rolling_cov
     )
 
     v1_2 = AllWeatherConstrainedUS(
@@ -246,7 +352,8 @@ def main():
         rebalance_freq='W-MON',
         lookback=252,
         commission_rate=0.001,
-        target_volatility=None
+        target_volatility=None,
+        rolling_cov=rolling_cov
     )
 
     v1_3 = AllWeather4QuadrantUS(
@@ -255,7 +362,8 @@ def main():
         rebalance_freq='W-MON',
         lookback=252,
         commission_rate=0.001,
-        target_volatility=None
+        target_volatility=None,
+        rolling_cov=rolling_cov
     )
 
     v1_3_vol = AllWeather4QuadrantUS(
@@ -264,22 +372,30 @@ def main():
         rebalance_freq='W-MON',
         lookback=252,
         commission_rate=0.001,
-        target_volatility=0.038  # 3.8% target volatility (optimal)
+        target_volatility=0.038,  # 3.8% target volatility (optimal)
+        rolling_cov=rolling_cov
     )
 
-    # Run backtests
-    results = []
-    results.append(run_version("v1.1 Pure RP", v1_1))
-    results.append(run_version("v1.2 Constrained RP", v1_2))
-    results.append(run_version("v1.3 4-Quadrant", v1_3))
-    results.append(run_version("v1.3 + Vol(3.8%)", v1_3_vol))
+    # Run backtests; the versions are independent, so each gets its own worker
+    versions = [
+        ("v1.1 Pure RP", v1_1),
+        ("v1.2 Constrained RP", v1_2),
+        ("v1.3 4-Quadrant", v1_3),
+        ("v1.3 + Vol(3.8%)", v1_3_vol),
+    ]
+    results = Parallel(n_jobs=len(versions), backend='loky', batch_size=1)(
+        delayed(run_version)(name, strategy, prices_key)
+        for name, strategy in versions
+    )
+    for result in results:
+        print_version(result)
 
     # Create comparison table
     print("\n" + "="*70)
     print("PERFORMANCE COMPARISON")
     print("="*70)
     comparison_table = create_comparison_table(results)
-    print(comparison_table)
+    print(format_comparison_table(comparison_table))
     print("="*70)
 
     # Highlight which versions meet goal
@@ -292,7 +408,8 @@ def main():
     print("="*70)
 
     # Plot comparison
-    plot_comparison(results)
+    if plot:
+        plot_comparison(results, show=show)
 
     # Save results
     comparison_table.to_csv('results/4quadrant_comparison.csv')
@@ -304,4 +421,11 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--no-plot', action='store_true',
+                        help='skip the comparison charts (table and CSV only)')
+    parser.add_argument('--show', action='store_true',
+                        help='display the charts after saving them')
+    args = parser.parse_args()
+
+    main(plot=not args.no_plot, show=args.show)
@@ -7,22 +7,111 @@ Compares the original v1.0 baseline with enhanced version featuring:
 - Enhanced tail risk metrics
 """
 
+import argparse
+import io
 import sys
 sys.path.append('.')
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from src.data_loader import load_prices
 from src.strategy import AllWeatherV1
-from src.metrics import format_metrics
+from src.metrics import format_metrics, rolling_sharpe, running_drawdown
+from src.utils import format_table
 
 # Configuration
 START_DATE = '2018-01-01'
 INITIAL_CAPITAL = 1_000_000
 
-def run_comparison():
-    """Run baseline vs enhanced comparison."""
+BASELINE_CONFIG = {
+    'rebalance_freq': 'W-MON',  # Weekly (original)
+    'lookback': 100,
+    'commission_rate': 0.0003,
+    'target_volatility': None,  # No vol targeting (original)
+}
+
+ENHANCED_CONFIG = {
+    'rebalance_freq': 'MS',  # Monthly (enhanced)
+    'lookback': 100,
+    'commission_rate': 0.0003,
+    'target_volatility': 0.06,  # 6% target (enhanced)
+}
+
+# Comparison table rows (display format) and the metrics they show; the
+# final value row comes from the backtest results
+COMPARISON_FORMATS = {
+    'Annual Return': '{:.2%}',
+    'Annual Volatility': '{:.2%}',
+    'Sharpe Ratio': '{:.2f}',
+    'Sortino Ratio': '{:.2f}',
+    'Max Drawdown': '{:.2%}',
+    'Calmar Ratio': '{:.2f}',
+    'Win Rate': '{:.2%}',
+    'Final Value': '¥{:,.0f}',
+}
+COMPARISON_KEYS = [
+    'annual_return', 'annual_volatility', 'sharpe_ratio', 'sortino_ratio',
+    'max_drawdown', 'calmar_ratio', 'win_rate',
+]
+
+TAIL_FORMATS = {
+    'VaR (95%)': '{:.2%}',
+    'VaR (99%)': '{:.2%}',
+    'CVaR (95%)': '{:.2%}',
+    'CVaR (99%)': '{:.2%}',
+    'Skewness': '{:.2f}',
+    'Kurtosis': '{:.2f}',
+    'Tail Ratio': '{:.2f}',
+}
+TAIL_KEYS = ['var_95', 'var_99', 'cvar_95', 'cvar_99', 'skewness', 'kurtosis', 'tail_ratio']
+
+# Price panel of a worker process, set once by _init_worker
+_PRICES = None
+
+
+def _init_worker(prices):
+    """Keep the price panel in the worker so it is pickled once, not per task."""
+    global _PRICES
+    _PRICES = prices
+
+
+def _run_one(config):
+    """
+    Run one AllWeatherV1 backtest in a worker process.
+
+    The verbose backtest log is captured rather than printed, so the parent can
+    print each run's log in order even though the runs overlap.
+
+    Args:
+        config: AllWeatherV1 keyword arguments (besides prices and capital)
+
+    Returns:
+        run_backtest results, plus 'total_commissions' and the captured 'log'
+    """
+    strategy = AllWeatherV1(prices=_PRICES, initial_capital=INITIAL_CAPITAL, **config)
+
+    log = io.StringIO()
+    with redirect_stdout(log):
+        results = strategy.run_backtest(start_date=START_DATE, verbose=True)
+
+    results['total_commissions'] = strategy.portfolio.get_total_commissions()
+    results['log'] = log.getvalue()
+
+    return results
+
+
+def run_comparison(show=False, prices=None, parallel=True):
+    """
+    Run baseline vs enhanced comparison.
+
+    Args:
+        show: Also display the comparison charts interactively
+        prices: ETF price panel; loaded from data/etf_prices_7etf.csv if None
+        parallel: Run the backtests in worker processes (False runs them in
+                  this process, e.g. when it already is a worker)
+    """
 
     print("=" * 80)
     print("All Weather Strategy - Enhanced vs Baseline Comparison")
@@ -30,25 +119,29 @@ def run_comparison():
 
     # Load data
     print("\nLoading ETF data...")
-    prices = load_prices('data/etf_prices_7etf.csv')
+    if prices is None:
+        prices = load_prices('data/etf_prices_7etf.csv')
     print(f"Loaded {len(prices.columns)} ETFs from {prices.index[0].date()} to {prices.index[-1].date()}")
 
+    # Independent backtests: run them side by side on separate cores
+    configs = {'baseline': BASELINE_CONFIG, 'enhanced': ENHANCED_CONFIG}
+    if parallel:
+        with ProcessPoolExecutor(max_workers=len(configs), initializer=_init_worker,
+                                 initargs=(prices,)) as executor:
+            futures = {executor.submit(_run_one, config): name for name, config in configs.items()}
+            runs = {futures[future]: future.result() for future in as_completed(futures)}
+    else:
+        _init_worker(prices)
+        runs = {name: _run_one(config) for name, config in configs.items()}
+
     # ===== BASELINE v1.0 (Original) =====
     print("\n" + "=" * 80)
     print("BASELINE v1.0 (Original)")
     print("=" * 80)
     print("Config: Weekly rebalancing, 100-day lookback, NO volatility targeting")
 
-    baseline = AllWeatherV1(
-        prices=prices,
-        initial_capital=INITIAL_CAPITAL,
-        rebalance_freq='W-MON',  # Weekly (original)
-        lookback=100,
-        commission_rate=0.0003,
-        target_volatility=None  # No vol targeting (original)
-    )
-
-    baseline_results = baseline.run_backtest(start_date=START_DATE, verbose=True)
+    baseline_results = runs['baseline']
+    sys.stdout.write(baseline_results['log'])
     baseline_metrics = baseline_results['metrics']
 
     print("\nBASELINE Performance:")
@@ -62,16 +155,8 @@ def run_comparison():
     print("=" * 80)
     print("Config: Monthly rebalancing, 100-day lookback, 6% volatility targeting")
 
-    enhanced = AllWeatherV1(
-        prices=prices,
-        initial_capital=INITIAL_CAPITAL,
-        rebalance_freq='MS',  # Monthly (enhanced)
-        lookback=100,
-        commission_rate=0.0003,
-        target_volatility=0.06  # 6% target (enhanced)
-    )
-
-    enhanced_results = enhanced.run_backtest(start_date=START_DATE, verbose=True)
+    enhanced_results = runs['enhanced']
+    sys.stdout.write(enhanced_results['log'])
     enhanced_metrics = enhanced_results['metrics']
 
     print("\nENHANCED Performance:")
@@ -85,48 +170,12 @@ def run_comparison():
     print("=" * 80)
 
     comparison = pd.DataFrame({
-        'Baseline': [
-            f"{baseline_metrics['annual_return']:.2%}",
-            f"{baseline_metrics['annual_volatility']:.2%}",
-            f"{baseline_metrics['sharpe_ratio']:.2f}",
-            f"{baseline_metrics['sortino_ratio']:.2f}",
-            f"{baseline_metrics['max_drawdown']:.2%}",
-            f"{baseline_metrics['calmar_ratio']:.2f}",
-            f"{baseline_metrics['win_rate']:.2%}",
-            f"¥{baseline_results['final_value']:,.0f}"
-        ],
-        'Enhanced': [
-            f"{enhanced_metrics['annual_return']:.2%}",
-            f"{enhanced_metrics['annual_volatility']:.2%}",
-            f"{enhanced_metrics['sharpe_ratio']:.2f}",
-            f"{enhanced_metrics['sortino_ratio']:.2f}",
-            f"{enhanced_metrics['max_drawdown']:.2%}",
-            f"{enhanced_metrics['calmar_ratio']:.2f}",
-            f"{enhanced_metrics['win_rate']:.2%}",
-            f"¥{enhanced_results['final_value']:,.0f}"
-        ],
-        'Improvement': [
-            f"{(enhanced_metrics['annual_return'] - baseline_metrics['annual_return']):.2%}",
-            f"{(enhanced_metrics['annual_volatility'] - baseline_metrics['annual_volatility']):.2%}",
-            f"{(enhanced_metrics['sharpe_ratio'] - baseline_metrics['sharpe_ratio']):.2f}",
-            f"{(enhanced_metrics['sortino_ratio'] - baseline_metrics['sortino_ratio']):.2f}",
-            f"{(enhanced_metrics['max_drawdown'] - baseline_metrics['max_drawdown']):.2%}",
-            f"{(enhanced_metrics['calmar_ratio'] - baseline_metrics['calmar_ratio']):.2f}",
-            f"{(enhanced_metrics['win_rate'] - baseline_metrics['win_rate']):.2%}",
-            f"¥{(enhanced_results['final_value'] - baseline_results['final_value']):,.0f}"
-        ]
-    }, index=[
-        'Annual Return',
-        'Annual Volatility',
-        'Sharpe Ratio',
-        'Sortino Ratio',
-        'Max Drawdown',
-        'Calmar Ratio',
-        'Win Rate',
-        'Final Value'
-    ])
-
-    print(comparison)
+        'Baseline': [baseline_metrics[key] for key in COMPARISON_KEYS] + [baseline_results['final_value']],
+        'Enhanced': [enhanced_metrics[key] for key in COMPARISON_KEYS] + [enhanced_results['final_value']],
+    }, index=list(COMPARISON_FORMATS))
+    comparison['Improvement'] = comparison['Enhanced'] - comparison['Baseline']
+
+    print(format_table(comparison, COMPARISON_FORMATS))
 
     # ===== TAIL RISK COMPARISON =====
     print("\n" + "=" * 80)
@@ -134,49 +183,42 @@ def run_comparison():
     print("=" * 80)
 
     tail_comparison = pd.DataFrame({
-        'Baseline': [
-            f"{baseline_metrics['var_95']:.2%}",
-            f"{baseline_metrics['var_99']:.2%}",
-            f"{baseline_metrics['cvar_95']:.2%}",
-            f"{baseline_metrics['cvar_99']:.2%}",
-            f"{baseline_metrics['skewness']:.2f}",
-            f"{baseline_metrics['kurtosis']:.2f}",
-            f"{baseline_metrics['tail_ratio']:.2f}"
-        ],
-        'Enhanced': [
-            f"{enhanced_metrics['var_95']:.2%}",
-            f"{enhanced_metrics['var_99']:.2%}",
-            f"{enhanced_metrics['cvar_95']:.2%}",
-            f"{enhanced_metrics['cvar_99']:.2%}",
-            f"{enhanced_metrics['skewness']:.2f}",
-            f"{enhanced_metrics['kurtosis']:.2f}",
-            f"{enhanced_metrics['tail_ratio']:.2f}"
-        ]
-    }, index=[
-        'VaR (95%)',
-        'VaR (99%)',
-        'CVaR (95%)',
-        'CVaR (99%)',
-        'Skewness',
-        'Kurtosis',
-        'Tail Ratio'
-    ])
-
-    print(tail_comparison)
+        'Baseline': [baseline_metrics[key] for key in TAIL_KEYS],
+        'Enhanced': [enhanced_metrics[key] for key in TAIL_KEYS],
+    }, index=list(TAIL_FORMATS))
+
+    print(format_table(tail_comparison, TAIL_FORMATS))
 
     # ===== VISUALIZATIONS =====
     create_comparison_charts(
         baseline_results['equity_curve'],
         enhanced_results['equity_curve'],
         baseline_results['weights_history'],
-        enhanced_results['weights_history']
+        enhanced_results['weights_history'],
+        show=show
     )
 
     return baseline_results, enhanced_results
 
 
-def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights, enhanced_weights):
-    """Create comparison visualizations."""
+def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights, enhanced_weights,
+                             show=False):
+    """
+    Create comparison visualizations.
+
+    Args:
+        baseline_equity: Baseline equity curve
+        enhanced_equity: Enhanced equity curve
+        baseline_weights: Baseline weights history
+        enhanced_weights: Enhanced weights history
+        show: Open the figure window after saving; otherwise render
+              straight to the PNG with the non-interactive Agg backend
+    """
+    # Imported here so the backend can be picked before pyplot loads
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
     fig = plt.figure(figsize=(16, 12))
     gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
@@ -195,8 +237,8 @@ def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights,
 
     # Plot 2: Drawdown Comparison
     ax2 = fig.add_subplot(gs[1, 0])
-    baseline_dd = (baseline_equity / baseline_equity.expanding().max() - 1) * 100
-    enhanced_dd = (enhanced_equity / enhanced_equity.expanding().max() - 1) * 100
+    baseline_dd = pd.Series(running_drawdown(baseline_equity)[0] * 100, index=baseline_equity.index)
+    enhanced_dd = pd.Series(running_drawdown(enhanced_equity)[0] * 100, index=enhanced_equity.index)
     ax2.fill_between(baseline_dd.index, baseline_dd.values, 0,
                       alpha=0.3, color='#2E86AB', label='Baseline')
     ax2.fill_between(enhanced_dd.index, enhanced_dd.values, 0,
@@ -209,17 +251,13 @@ def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights,
 
     # Plot 3: Rolling Sharpe Ratio (252-day window)
     ax3 = fig.add_subplot(gs[1, 1])
-    baseline_returns = baseline_equity.pct_change().dropna()
-    enhanced_returns = enhanced_equity.pct_change().dropna()
+    returns = pd.concat(
+        [baseline_equity, enhanced_equity], axis=1, keys=['baseline', 'enhanced']
+    ).pct_change().dropna()
 
-    baseline_rolling_sharpe = (
-        baseline_returns.rolling(252).mean() * 252 /
-        (baseline_returns.rolling(252).std() * np.sqrt(252))
-    )
-    enhanced_rolling_sharpe = (
-        enhanced_returns.rolling(252).mean() * 252 /
-        (enhanced_returns.rolling(252).std() * np.sqrt(252))
-    )
+    rolling_sharpes = rolling_sharpe(returns, window=252)
+    baseline_rolling_sharpe = rolling_sharpes['baseline']
+    enhanced_rolling_sharpe = rolling_sharpes['enhanced']
 
     ax3.plot(baseline_rolling_sharpe.index, baseline_rolling_sharpe.values,
              label='Baseline', linewidth=2, alpha=0.7, color='#2E86AB')
@@ -233,11 +271,11 @@ def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights,
     ax3.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
 
     # Plot 4: Baseline Allocation
-    ax4 = fig.add_subplot(gs[2, 0])
+    ax4 = fig.add_subplot(gs[2, 0], sharex=ax1)
     if not baseline_weights.empty:
         baseline_weights_pct = baseline_weights * 100
         ax4.stackplot(baseline_weights_pct.index,
-                      *[baseline_weights_pct[col].values for col in baseline_weights_pct.columns],
+                      baseline_weights_pct.to_numpy().T,
                       labels=baseline_weights_pct.columns,
                       alpha=0.8)
     ax4.set_xlabel('Date', fontsize=11)
@@ -248,28 +286,34 @@ def create_comparison_charts(baseline_equity, enhanced_equity, baseline_weights,
     ax4.grid(True, alpha=0.3)
 
     # Plot 5: Enhanced Allocation
-    ax5 = fig.add_subplot(gs[2, 1])
+    ax5 = fig.add_subplot(gs[2, 1], sharex=ax1, sharey=ax4)
     if not enhanced_weights.empty:
         enhanced_weights_pct = enhanced_weights * 100
         ax5.stackplot(enhanced_weights_pct.index,
-                      *[enhanced_weights_pct[col].values for col in enhanced_weights_pct.columns],
+                      enhanced_weights_pct.to_numpy().T,
                       labels=enhanced_weights_pct.columns,
                       alpha=0.8)
     ax5.set_xlabel('Date', fontsize=11)
     ax5.set_ylabel('Allocation (%)', fontsize=11)
     ax5.set_title('Enhanced Allocation (Monthly Rebalance)', fontsize=12, fontweight='bold')
     ax5.legend(loc='upper left', fontsize=8)
-    ax5.set_ylim(0, 100)
     ax5.grid(True, alpha=0.3)
 
     plt.suptitle('All Weather Strategy: Enhanced vs Baseline', fontsize=16, fontweight='bold', y=0.995)
     plt.savefig('enhanced_vs_baseline_comparison.png', dpi=300, bbox_inches='tight')
     print(f"\nComparison charts saved to: enhanced_vs_baseline_comparison.png")
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
 if __name__ == '__main__':
-    baseline_results, enhanced_results = run_comparison()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--show', action='store_true',
+                        help='display the charts after saving them')
+    args = parser.parse_args()
+
+    baseline_results, enhanced_results = run_comparison(show=args.show)
 
     print("\n" + "=" * 80)
     print("SUMMARY")
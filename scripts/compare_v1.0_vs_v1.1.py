@@ -4,12 +4,13 @@ Compare v1.0 (always rebalance) vs v1.1 (adaptive rebalancing)
 Tests the impact of adaptive rebalancing on transaction costs and performance.
 """
 
+import argparse
 import sys
 sys.path.append('.')
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 from datetime import datetime
 import os
 
@@ -17,6 +18,16 @@ from src.data_loader import load_prices
 from src.strategy import AllWeatherV1
 from src.metrics import calculate_all_metrics
 
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument('--show', action='store_true',
+                    help='display the chart after saving it')
+args = parser.parse_args()
+
+# Render straight to the PNG unless the chart window is wanted
+if not args.show:
+    matplotlib.use('Agg')  # Non-interactive backend
+import matplotlib.pyplot as plt
+
 print("="*70)
 print("ALL WEATHER v1.0 vs v1.1 COMPARISON")
 print("="*70)
@@ -57,6 +68,10 @@ print("\n" + "="*70)
 print("PERFORMANCE COMPARISON")
 print("="*70)
 
+# Commissions and trade counts of each version, read in one pass
+comm_arr_v10, commission_v10, n_trades_v10 = strategy_v10.portfolio.summary()
+comm_arr_v11, commission_v11, n_trades_v11 = strategy_v11.portfolio.summary()
+
 comparison = pd.DataFrame({
     'v1.0 (Always)': [
         f"{results_v10['total_return']:.2%}",
@@ -67,8 +82,8 @@ comparison = pd.DataFrame({
         f"¥{results_v10['final_value']:,.0f}",
         results_v10['rebalances_executed'],
         results_v10['rebalances_skipped'],
-        f"¥{strategy_v10.portfolio.get_total_commissions():,.0f}",
-        strategy_v10.portfolio.get_trade_count(),
+        f"¥{commission_v10:,.0f}",
+        n_trades_v10,
     ],
     'v1.1 (Adaptive)': [
         f"{results_v11['total_return']:.2%}",
@@ -79,8 +94,8 @@ comparison = pd.DataFrame({
         f"¥{results_v11['final_value']:,.0f}",
         results_v11['rebalances_executed'],
         results_v11['rebalances_skipped'],
-        f"¥{strategy_v11.portfolio.get_total_commissions():,.0f}",
-        strategy_v11.portfolio.get_trade_count(),
+        f"¥{commission_v11:,.0f}",
+        n_trades_v11,
     ]
 }, index=[
     'Total Return',
@@ -98,8 +113,6 @@ comparison = pd.DataFrame({
 print(comparison)
 
 # Calculate savings
-commission_v10 = strategy_v10.portfolio.get_total_commissions()
-commission_v11 = strategy_v11.portfolio.get_total_commissions()
 commission_saved = commission_v10 - commission_v11
 commission_pct_saved = (commission_saved / commission_v10) * 100 if commission_v10 > 0 else 0
 
@@ -133,10 +146,8 @@ ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'¥{x/1e6:.2f}M'))
 
 # Cumulative commissions
 ax2 = axes[0, 1]
-trades_v10 = strategy_v10.portfolio.trade_history
-trades_v11 = strategy_v11.portfolio.trade_history
-cum_comm_v10 = np.cumsum([t.commission for t in trades_v10])
-cum_comm_v11 = np.cumsum([t.commission for t in trades_v11])
+cum_comm_v10 = np.cumsum(comm_arr_v10)
+cum_comm_v11 = np.cumsum(comm_arr_v11)
 ax2.plot(range(len(cum_comm_v10)), cum_comm_v10, label='v1.0 (Always)', linewidth=2, alpha=0.8)
 ax2.plot(range(len(cum_comm_v11)), cum_comm_v11, label='v1.1 (Adaptive)', linewidth=2, alpha=0.8)
 ax2.set_title('Cumulative Commissions', fontsize=12, fontweight='bold')
@@ -189,7 +200,9 @@ ax4.grid(True, alpha=0.3, axis='y')
 plt.tight_layout()
 plt.savefig('results/v1.0_vs_v1.1_comparison.png', dpi=150, bbox_inches='tight')
 print(f"\nChart saved to results/v1.0_vs_v1.1_comparison.png")
-plt.show()
+if args.show:
+    plt.show()
+plt.close(fig)
 
 print("\n" + "="*70)
 print("CONCLUSION")
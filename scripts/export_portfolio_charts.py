@@ -11,6 +11,8 @@ sys.path.insert(0, '/Users/zdf/Documents/GitHub/all-weather')
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend: charts are only saved
 import matplotlib.pyplot as plt
 from pathlib import Path
 
@@ -100,13 +102,15 @@ def generate_charts():
         '513100.SH': 'Nasdaq 100'
     }
 
-    # Rename columns for display
-    weights_display = weights_df.rename(columns=etf_names)
+    # Readable labels in column order (no renamed copy of the weights)
+    labels = [etf_names.get(etf, etf) for etf in weights_df.columns]
 
     # Use a nice color palette
     colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#3B1F2B', '#7B2D26', '#95B2B8']
 
-    weights_display.plot.area(stacked=True, ax=ax, alpha=0.8, color=colors[:len(weights_display.columns)])
+    ax.stackplot(weights_df.index, weights_df.to_numpy().T,
+                 labels=labels, colors=colors[:len(labels)], alpha=0.8)
+    ax.set_xlim(weights_df.index[0], weights_df.index[-1])  # Tight, like pandas' area plot
 
     ax.set_title('Asset Allocation Over Time', fontsize=14, fontweight='bold')
     ax.set_ylabel('Portfolio Weight', fontsize=12)
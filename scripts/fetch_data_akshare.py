@@ -8,6 +8,7 @@ Install: pip install akshare
 import akshare as ak
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 print("=" * 80)
@@ -29,11 +30,17 @@ etf_codes = {
 print("\nFetching data from AkShare...")
 print("-" * 80)
 
-prices_dict = {}
 
-for code, name in etf_codes.items():
-    print(f"\nFetching {code} ({name})...")
+def fetch_etf_history(code):
+    """
+    Download one ETF's daily forward-adjusted history from AkShare.
+
+    Args:
+        code: 6-digit ETF code
 
+    Returns:
+        (history DataFrame or None, exception or None)
+    """
     try:
         # AkShare ETF historical data function
         # symbol: ETF code (6 digits)
@@ -49,6 +56,26 @@ for code, name in etf_codes.items():
             end_date=datetime.now().strftime("%Y%m%d"),
             adjust="qfq"  # 前复权
         )
+        return df, None
+
+    except Exception as e:
+        return None, e
+
+
+# Requests are network-bound: issue them all at once, one thread per ETF
+with ThreadPoolExecutor(max_workers=len(etf_codes)) as executor:
+    downloads = dict(zip(etf_codes, executor.map(fetch_etf_history, etf_codes)))
+
+prices_dict = {}
+
+# Report in ETF order, as the requests complete in any order
+for code, name in etf_codes.items():
+    print(f"\nFetching {code} ({name})...")
+    df, error = downloads[code]
+
+    try:
+        if error is not None:
+            raise error
 
         if df is not None and len(df) > 0:
             # AkShare returns columns: 日期, 开盘, 收盘, 最高, 最低, 成交量, 成交额, 振幅, 涨跌幅, 涨跌额, 换手率
@@ -112,15 +139,20 @@ print("\n" + "=" * 80)
 print("SUMMARY STATISTICS")
 print("=" * 80)
 
-for col in prices.columns:
+# All ETFs at once (std skips each column's leading NaN return)
+first_prices = prices.iloc[0]
+last_prices = prices.iloc[-1]
+total_returns = (last_prices / first_prices - 1) * 100
+ann_vols = prices.pct_change().std() * np.sqrt(252) * 100
+
+for col, first, last, total_return, ann_vol in zip(
+    prices.columns, first_prices, last_prices, total_returns, ann_vols
+):
     code = col.replace('.SH', '')
-    returns = prices[col].pct_change().dropna()
-    total_return = (prices[col].iloc[-1] / prices[col].iloc[0] - 1) * 100
-    ann_vol = returns.std() * np.sqrt(252) * 100
 
     print(f"\n{col} ({etf_codes[code]}):")
-    print(f"  First: {prices[col].iloc[0]:.3f}")
-    print(f"  Last: {prices[col].iloc[-1]:.3f}")
+    print(f"  First: {first:.3f}")
+    print(f"  Last: {last:.3f}")
     print(f"  Total return: {total_return:.2f}%")
     print(f"  Ann. volatility: {ann_vol:.2f}%")
 
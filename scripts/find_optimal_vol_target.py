@@ -2,46 +2,95 @@
 Find optimal volatility target that just meets -10% max drawdown threshold.
 """
 
+import io
 import sys
 sys.path.append('.')
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
 from src.data_loader_us import download_us_etfs, get_all_weather_us_etfs
-from src.strategy_us import AllWeather4QuadrantUS
+from src.metrics import running_drawdown
+from src.strategy_us import AllWeather4QuadrantUS, rolling_covariances
+
+# Test range: 3.0% to 4.0% in 0.2% steps
+VOL_TARGETS = [0.030, 0.032, 0.034, 0.036, 0.038, 0.040]
+
+# Price panel of a worker process and its rolling covariances, set once by
+# _init_worker
+_PRICES = None
+_ROLLING_COV = None
+
 
-# Load data
-etf_info = get_all_weather_us_etfs()
-tickers = list(etf_info.keys())
-prices = download_us_etfs(tickers=tickers, start_date='2015-01-01', progress=False)
+def _init_worker(prices, rolling_cov):
+    """Keep the shared inputs in the worker so they are pickled once, not per task."""
+    global _PRICES, _ROLLING_COV
+    _PRICES = prices
+    _ROLLING_COV = rolling_cov
 
-print("Finding optimal volatility target (max DD < -10%)...\n")
-print("="*80)
 
-# Test range: 3.0% to 4.0% in 0.1% steps
-vol_targets = [0.030, 0.032, 0.034, 0.036, 0.038, 0.040]
+def _run_one(vol_target):
+    """
+    Backtest the 4-quadrant strategy at one volatility target.
 
-for vol_target in vol_targets:
+    Args:
+        vol_target: Annualized target volatility
+
+    Returns:
+        (backtest log, results, max drawdown)
+    """
     strategy = AllWeather4QuadrantUS(
-        prices=prices,
+        prices=_PRICES,
         initial_capital=100_000,
         rebalance_freq='W-MON',
         lookback=252,
         commission_rate=0.001,
-        target_volatility=vol_target
+        target_volatility=vol_target,
+        rolling_cov=_ROLLING_COV
     )
 
-    results = strategy.run_backtest(start_date='2018-01-01')
+    # Capture the backtest's progress output so runs do not interleave
+    log = io.StringIO()
+    with redirect_stdout(log):
+        results = strategy.run_backtest(start_date='2018-01-01')
+
+    # Single pass over the equity values (no pandas expanding window)
+    _, max_dd = running_drawdown(results['equity_curve'])
+
+    return log.getvalue(), results, max_dd
+
+
+def main():
+    """Backtest every volatility target in parallel and report max drawdowns."""
+    # Load data
+    etf_info = get_all_weather_us_etfs()
+    tickers = list(etf_info.keys())
+    prices = download_us_etfs(tickers=tickers, start_date='2015-01-01', progress=False)
+
+    print("Finding optimal volatility target (max DD < -10%)...\n")
+    print("="*80)
+
+    # Covariances do not depend on the volatility target: estimate them once
+    rolling_cov = rolling_covariances(prices, lookback=252)
+
+    # Independent backtests on the same prices: one worker per target
+    with ProcessPoolExecutor(max_workers=len(VOL_TARGETS), initializer=_init_worker,
+                             initargs=(prices, rolling_cov)) as executor:
+        runs = list(executor.map(_run_one, VOL_TARGETS))
+
+    for vol_target, (log, results, max_dd) in zip(VOL_TARGETS, runs):
+        sys.stdout.write(log)
+
+        status = "✓ PASS" if max_dd > -0.10 else "✗ FAIL"
 
-    equity = results['equity_curve']
-    running_max = equity.expanding().max()
-    drawdown = (equity - running_max) / running_max
-    max_dd = drawdown.min()
+        print(f"Vol: {vol_target:.1%} | Return: {results['metrics']['annual_return']:6.2%} | "
+              f"Vol: {results['metrics']['annual_volatility']:6.2%} | "
+              f"Max DD: {max_dd:7.2%} | Sharpe: {results['metrics']['sharpe_ratio']:5.2f} | {status}")
 
-    status = "✓ PASS" if max_dd > -0.10 else "✗ FAIL"
+    print("="*80)
+    print("\nRecommendation: Use the highest volatility target that still achieves max DD < -10%")
+    print("This maximizes returns while meeting the drawdown constraint.")
 
-    print(f"Vol: {vol_target:.1%} | Return: {results['metrics']['annual_return']:6.2%} | "
-          f"Vol: {results['metrics']['annual_volatility']:6.2%} | "
-          f"Max DD: {max_dd:7.2%} | Sharpe: {results['metrics']['sharpe_ratio']:5.2f} | {status}")
 
-print("="*80)
-print("\nRecommendation: Use the highest volatility target that still achieves max DD < -10%")
-print("This maximizes returns while meeting the drawdown constraint.")
+if __name__ == '__main__':
+    main()
@@ -42,20 +42,41 @@ BENCHMARK_TICKER = '510300.SH'  # CSI 300 as benchmark
 
 
 def fetch_prices(tickers: list[str], start: str = '2015-01-01') -> pd.DataFrame:
-    """Fetch historical prices from yfinance."""
-    data = {}
+    """Fetch historical prices from yfinance in one batched download."""
+    yf_tickers = {ticker.replace('.SH', '.SS'): ticker for ticker in tickers}
+    data = yf.download(
+        tickers=list(yf_tickers),
+        start=start,
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+    )
+
+    # MultiIndex columns (price_type, ticker); a single ticker may come back flat
+    close = data['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(next(iter(yf_tickers)))
+    prices = close.reindex(columns=list(yf_tickers)).rename(columns=yf_tickers)
     for ticker in tickers:
-        yf_ticker = ticker.replace('.SH', '.SS')
-        hist = yf.Ticker(yf_ticker).history(start=start, auto_adjust=True)
-        if hist.empty:
+        if prices[ticker].isna().all():
             raise ValueError(f"No data for {ticker}")
-        data[ticker] = hist['Close']
 
-    prices = pd.DataFrame(data)
-    prices.index = prices.index.tz_localize(None)
+    if prices.index.tz is not None:
+        prices.index = prices.index.tz_localize(None)
     return prices.dropna()
 
 
+def _pnl_points(values: pd.Series, base: float) -> list[dict]:
+    """Express a value series as tracker points of % PnL against base."""
+    pnl_pct = (values.to_numpy(dtype=float) - base) / base * 100
+    dates = values.index.strftime('%Y-%m-%d')
+    # Python's round (not np.round) keeps the stored JSON values unchanged
+    return [
+        {'date': date, 'value': round(value, 2)}
+        for date, value in zip(dates, pnl_pct.tolist())
+    ]
+
+
 def calculate_benchmark(prices: pd.DataFrame, start_date: str) -> list[dict]:
     """Calculate benchmark (CSI300) returns from start date."""
     benchmark_prices = prices[BENCHMARK_TICKER]
@@ -64,16 +85,7 @@ def calculate_benchmark(prices: pd.DataFrame, start_date: str) -> list[dict]:
     if benchmark_prices.empty:
         return []
 
-    initial_price = benchmark_prices.iloc[0]
-    benchmark_series = []
-    for date, price in benchmark_prices.items():
-        pnl_pct = (price - initial_price) / initial_price * 100
-        benchmark_series.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'value': round(pnl_pct, 2)
-        })
-
-    return benchmark_series
+    return _pnl_points(benchmark_prices, benchmark_prices.iloc[0])
 
 
 def simulate_strategy(prices: pd.DataFrame) -> dict:
@@ -98,14 +110,7 @@ def simulate_strategy(prices: pd.DataFrame) -> dict:
     )
 
     # Convert equity curve to PnL percentage series
-    equity = results['equity_curve']
-    pnl_series = []
-    for date, value in equity.items():
-        pnl_pct = (value - INITIAL_CAPITAL) / INITIAL_CAPITAL * 100
-        pnl_series.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'value': round(pnl_pct, 2)
-        })
+    pnl_series = _pnl_points(results['equity_curve'], INITIAL_CAPITAL)
 
     # Convert daily trades to rebalance events
     rebalances = []
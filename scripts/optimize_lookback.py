@@ -5,12 +5,16 @@ Tests different covariance estimation windows to find optimal lookback period.
 Evaluates based on Sharpe ratio, returns, and drawdown.
 """
 
+import os
 import sys
+import tempfile
 sys.path.append('.')
 
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import joblib
+from joblib import Parallel, delayed
 from src.data_loader import load_prices
 from src.strategy import AllWeatherV1
 
@@ -20,6 +24,57 @@ TARGET_VOLATILITY = 0.06  # 6% target (matching Dalio)
 REBALANCE_FREQ = 'MS'  # Monthly
 START_DATE = '2018-01-01'
 
+
+def backtest_lookback(prices_arr, index, columns, lookback):
+    """Run one full backtest for a single lookback period.
+
+    Top-level so joblib workers can pickle it. Prices arrive as a read-only
+    memory-mapped array shared by all workers, plus the (small) labels.
+
+    Args:
+        prices_arr: Price matrix (days x ETFs), typically a np.memmap
+        index: DatetimeIndex of the price matrix
+        columns: ETF tickers of the price matrix
+        lookback: Covariance estimation window in days
+
+    Returns:
+        Tuple of (result row dict or None, error message or None)
+    """
+    prices = pd.DataFrame(prices_arr, index=index, columns=columns, copy=False)
+
+    try:
+        # Run strategy with this lookback period
+        strategy = AllWeatherV1(
+            prices=prices,
+            initial_capital=1_000_000,
+            rebalance_freq=REBALANCE_FREQ,
+            lookback=lookback,
+            commission_rate=0.0003,
+            target_volatility=TARGET_VOLATILITY
+        )
+
+        backtest_results = strategy.run_backtest(
+            start_date=START_DATE,
+            verbose=False
+        )
+    except Exception as e:
+        return None, str(e)
+
+    metrics = backtest_results['metrics']
+
+    return {
+        'lookback': lookback,
+        'annual_return': metrics['annual_return'],
+        'annual_volatility': metrics['annual_volatility'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'sortino_ratio': metrics['sortino_ratio'],
+        'max_drawdown': metrics['max_drawdown'],
+        'calmar_ratio': metrics['calmar_ratio'],
+        'win_rate': metrics['win_rate'],
+        'final_value': backtest_results['final_value']
+    }, None
+
+
 def run_lookback_sensitivity():
     """Run backtest for each lookback period and compare results."""
 
@@ -32,53 +87,38 @@ def run_lookback_sensitivity():
     prices = load_prices('data/etf_prices_7etf.csv')
     print(f"Loaded {len(prices.columns)} ETFs from {prices.index[0].date()} to {prices.index[-1].date()}")
 
+    # Each lookback is an independent backtest, so run them in parallel.
+    # Workers share one read-only mapping of the price matrix (max_nbytes=None
+    # stops joblib from copying it); only the labels are pickled per task.
+    with tempfile.TemporaryDirectory() as mmap_dir:
+        mmap_path = os.path.join(mmap_dir, 'prices.mmap')
+        joblib.dump(prices.to_numpy(dtype=np.float64), mmap_path)
+        prices_arr = joblib.load(mmap_path, mmap_mode='r')
+
+        outcomes = Parallel(n_jobs=-1, backend='loky', max_nbytes=None)(
+            delayed(backtest_lookback)(prices_arr, prices.index, prices.columns, lookback)
+            for lookback in LOOKBACK_PERIODS
+        )
+
     results = []
 
-    for lookback in LOOKBACK_PERIODS:
+    for lookback, (row, error) in zip(LOOKBACK_PERIODS, outcomes):
         print(f"\n{'-' * 70}")
         print(f"Testing lookback = {lookback} days")
         print(f"{'-' * 70}")
 
-        try:
-            # Run strategy with this lookback period
-            strategy = AllWeatherV1(
-                prices=prices,
-                initial_capital=1_000_000,
-                rebalance_freq=REBALANCE_FREQ,
-                lookback=lookback,
-                commission_rate=0.0003,
-                target_volatility=TARGET_VOLATILITY
-            )
-
-            backtest_results = strategy.run_backtest(
-                start_date=START_DATE,
-                verbose=False
-            )
-
-            metrics = backtest_results['metrics']
-
-            # Store results
-            results.append({
-                'lookback': lookback,
-                'annual_return': metrics['annual_return'],
-                'annual_volatility': metrics['annual_volatility'],
-                'sharpe_ratio': metrics['sharpe_ratio'],
-                'sortino_ratio': metrics['sortino_ratio'],
-                'max_drawdown': metrics['max_drawdown'],
-                'calmar_ratio': metrics['calmar_ratio'],
-                'win_rate': metrics['win_rate'],
-                'final_value': backtest_results['final_value']
-            })
-
-            print(f"Annual Return:    {metrics['annual_return']:.2%}")
-            print(f"Sharpe Ratio:     {metrics['sharpe_ratio']:.2f}")
-            print(f"Max Drawdown:     {metrics['max_drawdown']:.2%}")
-            print(f"Final Value:      ¥{backtest_results['final_value']:,.0f}")
-
-        except Exception as e:
-            print(f"Error with lookback={lookback}: {e}")
+        if error is not None:
+            print(f"Error with lookback={lookback}: {error}")
             continue
 
+        # Store results
+        results.append(row)
+
+        print(f"Annual Return:    {row['annual_return']:.2%}")
+        print(f"Sharpe Ratio:     {row['sharpe_ratio']:.2f}")
+        print(f"Max Drawdown:     {row['max_drawdown']:.2%}")
+        print(f"Final Value:      ¥{row['final_value']:,.0f}")
+
     # Convert to DataFrame
     results_df = pd.DataFrame(results)
 
@@ -0,0 +1,108 @@
+"""
+Run All Comparison Scripts
+
+Runs the v1.0/v1.1/v1.2, enhanced-vs-baseline and constrained-vs-unconstrained
+comparisons side by side in separate processes. Each price CSV is parsed once
+here and handed to the workers as a memory-mapped .npy file; each
+comparison's output is captured and printed in script order at the end.
+"""
+
+import importlib.util
+import io
+import sys
+sys.path.append('.')
+
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from src.data_loader import load_prices
+from src.data_loader_us import load_us_data
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# (script, entry point, price panel it runs on, extra entry-point arguments).
+# Scripts with their own process pools run in-process: each comparison
+# already has a worker of its own here.
+COMPARISONS = [
+    ('compare_v1.0_v1.1_v1.2.py', 'main', 'cn', {'parallel': False}),
+    ('compare_enhanced_vs_baseline.py', 'run_comparison', 'cn', {'parallel': False}),
+    ('compare_constrained_vs_unconstrained.py', 'main', 'us', {}),
+]
+
+
+def save_price_panel(prices, path):
+    """
+    Save a price panel's values as .npy for memory-mapped reads.
+
+    Args:
+        prices: Price DataFrame
+        path: Destination .npy file
+
+    Returns:
+        (path, index, columns) needed to rebuild the DataFrame
+    """
+    np.save(path, prices.to_numpy(dtype=np.float64))
+    return str(path), prices.index, prices.columns
+
+
+def run_comparison_script(script, entry_point, panel, kwargs):
+    """
+    Run one comparison script's entry point in a worker process.
+
+    Args:
+        script: File name of the comparison script in scripts/
+        entry_point: Name of the function to call with prices=
+        panel: (path, index, columns) from save_price_panel
+        kwargs: Extra keyword arguments for the entry point
+
+    Returns:
+        Everything the comparison printed
+    """
+    # File names such as compare_v1.0_v1.1_v1.2.py are not importable by name
+    spec = importlib.util.spec_from_file_location(Path(script).stem.replace('.', '_'),
+                                                  SCRIPTS_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    path, index, columns = panel
+    prices = pd.DataFrame(np.load(path, mmap_mode='r'), index=index, columns=columns)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        getattr(module, entry_point)(prices=prices, **kwargs)
+
+    return output.getvalue()
+
+
+def main():
+    """Load each price panel once and run every comparison in parallel."""
+    print("Loading price data...")
+    panels = {
+        'cn': load_prices('data/etf_prices_7etf.csv'),
+        'us': load_us_data('data/us_etf_prices.csv'),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saved = {
+            name: save_price_panel(prices, Path(tmp_dir) / f'{name}_prices.npy')
+            for name, prices in panels.items()
+        }
+
+        outputs = Parallel(n_jobs=len(COMPARISONS), backend='loky', batch_size=1)(
+            delayed(run_comparison_script)(script, entry_point, saved[panel], kwargs)
+            for script, entry_point, panel, kwargs in COMPARISONS
+        )
+
+    for (script, _, _, _), output in zip(COMPARISONS, outputs):
+        print("\n" + "#" * 80)
+        print(f"# {script}")
+        print("#" * 80)
+        sys.stdout.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -23,8 +23,8 @@ print("="*80)
 # ============================================================================
 # Load both datasets
 # ============================================================================
-prices_old = pd.read_csv('data/etf_prices.csv', index_col=0, parse_dates=True)
-prices_clean = pd.read_csv('data/etf_prices_clean.csv', index_col=0, parse_dates=True)
+prices_old = load_prices('data/etf_prices.csv')
+prices_clean = load_prices('data/etf_prices_clean.csv')
 
 print(f"\nOld dataset:   {prices_old.shape[1]} ETFs (includes frozen 513300.SH, 511090.SH)")
 print(f"Clean dataset: {prices_clean.shape[1]} ETFs (high quality only)")
@@ -9,10 +9,9 @@ Backtest period: 2025-01-01 to latest available data.
 import sys
 from pathlib import Path
 
-import pandas as pd
-
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src import data_loader
 from src.strategy_v2 import AllWeatherV2
 
 # Use 6-ETF subset (same as live trading)
@@ -30,14 +29,9 @@ INITIAL_CAPITAL = 1_000_000
 
 
 def load_prices():
-    """Load prices from local CSV."""
-    prices = pd.read_csv(
-        'data/etf_prices_7etf.csv',
-        index_col=0,
-        parse_dates=True
-    )
+    """Load prices from local CSV (via its Parquet cache)."""
     # Filter to tradable ETFs only
-    return prices[TRADABLE_ETFS]
+    return data_loader.load_prices('data/etf_prices_7etf.csv', columns=TRADABLE_ETFS)
 
 
 def run_backtest(prices, drift_threshold, label):
@@ -4,11 +4,58 @@ Data Loading Utilities
 Functions for loading and preprocessing ETF price data.
 """
 
+import os
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from typing import Optional, List
 
 
+def _read_price_csv(filepath: str) -> pd.DataFrame:
+    """
+    Read a price CSV through a sibling Parquet cache.
+
+    The first read parses the CSV and writes a zstd `<name>.parquet` next to it;
+    later reads load the columnar copy as long as it is newer than the CSV.
+    The cache is written to a temporary file and moved into place, and an
+    unreadable cache is rebuilt from the CSV. Parquet support (pyarrow) is
+    optional: without it this is a plain CSV read.
+
+    Args:
+        filepath: Path to CSV file
+
+    Returns:
+        DataFrame with datetime index and ETF price columns
+    """
+    csv_path = Path(filepath)
+    cache_path = csv_path.with_suffix('.parquet')
+
+    if csv_path.suffix != '.csv':
+        return pd.read_csv(filepath, index_col=0, parse_dates=True)
+
+    try:
+        if cache_path.exists() and cache_path.stat().st_mtime >= csv_path.stat().st_mtime:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+    except ImportError:
+        return pd.read_csv(filepath, index_col=0, parse_dates=True)
+    except (OSError, ValueError):
+        # Truncated or corrupt cache (ArrowInvalid is a ValueError): rebuild it
+        pass
+
+    prices = pd.read_csv(filepath, index_col=0, parse_dates=True)
+
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        prices.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+        os.replace(tmp_path, cache_path)
+    except (ImportError, OSError):
+        # No pyarrow, full disk or read-only data directory: keep serving the CSV
+        tmp_path.unlink(missing_ok=True)
+
+    return prices
+
+
 def load_prices(
     filepath: str,
     start_date: Optional[str] = None,
@@ -16,7 +63,7 @@ def load_prices(
     columns: Optional[List[str]] = None
 ) -> pd.DataFrame:
     """
-    Load ETF price data from CSV file.
+    Load ETF price data from CSV file (via a Parquet cache when available).
 
     Args:
         filepath: Path to CSV file
@@ -27,7 +74,7 @@ def load_prices(
     Returns:
         DataFrame with datetime index and ETF price columns
     """
-    prices = pd.read_csv(filepath, index_col=0, parse_dates=True)
+    prices = _read_price_csv(filepath)
 
     # Filter by date range
     if start_date:
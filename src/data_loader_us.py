@@ -10,6 +10,8 @@ import yfinance as yf
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 
+from src.data_loader import _read_price_csv
+
 
 def download_us_etfs(
     tickers: List[str],
@@ -214,7 +216,7 @@ def save_us_data(prices: pd.DataFrame, filepath: str = 'data/us_etf_prices.csv')
 
 def load_us_data(filepath: str = 'data/us_etf_prices.csv') -> pd.DataFrame:
     """
-    Load US ETF data from CSV.
+    Load US ETF data from CSV (via a Parquet cache when available).
 
     Args:
         filepath: Input file path
@@ -222,7 +224,7 @@ def load_us_data(filepath: str = 'data/us_etf_prices.csv') -> pd.DataFrame:
     Returns:
         DataFrame of ETF prices
     """
-    prices = pd.read_csv(filepath, index_col=0, parse_dates=True)
+    prices = _read_price_csv(filepath)
     print(f"✓ Loaded US data from {filepath}")
     print(f"  Shape: {prices.shape}")
     print(f"  Period: {prices.index[0].date()} to {prices.index[-1].date()}")
@@ -6,9 +6,15 @@ Comprehensive performance calculations for portfolio analysis.
 
 import pandas as pd
 import numpy as np
-from typing import Union, Optional
+from typing import Union, Optional, Tuple
 from scipy import stats
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: fall back to the interpreted kernel
+    njit = None
+
 
 def annual_return(returns: Union[pd.Series, np.ndarray], periods_per_year: int = 252) -> float:
     """
@@ -130,19 +136,155 @@ def max_drawdown(equity_curve: Union[pd.Series, np.ndarray]) -> float:
     Returns:
         Maximum drawdown as negative decimal (e.g., -0.15 = -15%)
     """
-    if isinstance(equity_curve, np.ndarray):
-        equity_curve = pd.Series(equity_curve)
+    equity = np.asarray(equity_curve, dtype=np.float64)
 
-    if len(equity_curve) == 0:
+    if len(equity) == 0:
         return 0.0
 
-    # Calculate running maximum
-    running_max = equity_curve.expanding().max()
+    # Calculate running maximum (fmax skips NaNs like expanding().max())
+    running_max = np.fmax.accumulate(equity)
 
     # Calculate drawdown at each point
-    drawdown = (equity_curve - running_max) / running_max
+    drawdown = (equity - running_max) / running_max
+
+    return np.nanmin(drawdown)
+
+
+def _drawdown_kernel(equity: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Running-max drawdown and its minimum in one pass over the curve."""
+    n_periods = equity.shape[0]
+    drawdown = np.empty(n_periods)
+    running_max = equity[0]
+    min_drawdown = 0.0
+
+    for i in range(n_periods):
+        value = equity[i]
+        if value > running_max:
+            running_max = value
+        dd = (value - running_max) / running_max
+        drawdown[i] = dd
+        if dd < min_drawdown:
+            min_drawdown = dd
 
-    return drawdown.min()
+    return drawdown, min_drawdown
+
+
+if njit is not None:
+    # Compiled eagerly at import for float64 curves
+    _drawdown_kernel = njit(
+        ['Tuple((f8[::1], f8))(f8[::1])'],
+        cache=True,
+        fastmath=True,
+        boundscheck=False
+    )(_drawdown_kernel)
+
+
+def running_drawdown(equity_curve: Union[pd.Series, np.ndarray]) -> Tuple[np.ndarray, float]:
+    """
+    Calculate the drawdown series and maximum drawdown in a single pass.
+
+    Same values as (equity - running_max) / running_max and its minimum,
+    for a NaN-free equity curve.
+
+    Args:
+        equity_curve: Series or array of portfolio values
+
+    Returns:
+        Tuple of (drawdown array, maximum drawdown as negative decimal)
+    """
+    equity = np.require(np.asarray(equity_curve), np.float64, ['C', 'W'])
+
+    if len(equity) == 0:
+        return np.empty(0), 0.0
+
+    if njit is None:
+        # Without Numba a ufunc scan beats the interpreted loop
+        running_max = np.maximum.accumulate(equity)
+        drawdown = (equity - running_max) / running_max
+        return drawdown, min(drawdown.min(), 0.0)
+
+    return _drawdown_kernel(equity)
+
+
+def _rolling_sharpe_kernel(returns: np.ndarray, window: int, periods_per_year: int) -> np.ndarray:
+    """Rolling annualized Sharpe of each row from a running sum and sum of squares."""
+    n_series, n_periods = returns.shape
+    out = np.full((n_series, n_periods), np.nan)
+    ann_factor = np.sqrt(periods_per_year)
+
+    for j in range(n_series):
+        s = 0.0
+        s2 = 0.0
+        for i in range(n_periods):
+            r = returns[j, i]
+            s += r
+            s2 += r * r
+            if i >= window:
+                r_old = returns[j, i - window]
+                s -= r_old
+                s2 -= r_old * r_old
+            if i >= window - 1:
+                var = (s2 - s * s / window) / (window - 1)
+                if var > 0.0:
+                    out[j, i] = (s / window) / np.sqrt(var) * ann_factor
+
+    return out
+
+
+if njit is not None:
+    # Compiled eagerly at import for float64 returns
+    _rolling_sharpe_kernel = njit(
+        ['f8[:, ::1](f8[:, ::1], i8, i8)'],
+        cache=True,
+        fastmath=True,
+        boundscheck=False
+    )(_rolling_sharpe_kernel)
+
+
+def rolling_sharpe(
+    returns: Union[pd.Series, pd.DataFrame, np.ndarray],
+    window: int = 252,
+    periods_per_year: int = 252
+) -> Union[pd.Series, pd.DataFrame, np.ndarray]:
+    """
+    Calculate the rolling annualized Sharpe ratio (no risk-free rate).
+
+    Same values as rolling(window).mean() * periods_per_year /
+    (rolling(window).std() * sqrt(periods_per_year)), computed in one pass
+    instead of two rolling reductions. Several series on the same dates
+    (DataFrame or 2-D array columns) share one call. Returns containing NaN
+    (e.g. an undropped first pct_change row) take the pandas rolling path, so
+    windows are NaN only while they contain a NaN.
+
+    Args:
+        returns: Series, DataFrame or array (periods x series) of period returns
+        window: Rolling window length in periods
+        periods_per_year: Number of periods in a year
+
+    Returns:
+        Rolling Sharpe ratio (NaN until the first full window), with the
+        same shape, index and columns as returns
+    """
+    values = np.asarray(returns, dtype=np.float64)
+    # One contiguous row per series for the kernel
+    series = np.require(values.reshape(len(values), -1).T, np.float64, ['C', 'W'])
+
+    if njit is None or np.isnan(series).any():
+        # Without Numba pandas' rolling reductions beat the interpreted loop;
+        # the kernel's running sums would also never drop a NaN
+        rolling = pd.DataFrame(series.T).rolling(window)
+        sharpe = (rolling.mean() / rolling.std() * np.sqrt(periods_per_year)).to_numpy().T
+    else:
+        sharpe = _rolling_sharpe_kernel(series, window, periods_per_year)
+
+    sharpe = sharpe.T.reshape(values.shape)
+
+    if isinstance(returns, pd.Series):
+        return pd.Series(sharpe, index=returns.index, name=returns.name)
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(sharpe, index=returns.index, columns=returns.columns)
+
+    return sharpe
 
 
 def calmar_ratio(
@@ -358,6 +500,9 @@ def calculate_all_metrics(
     """
     Calculate all performance metrics at once.
 
+    Series inputs are reduced to float64 arrays once up front; passing
+    arrays directly skips that conversion.
+
     Args:
         returns: Series or array of period returns
         equity_curve: Optional equity curve
@@ -372,6 +517,10 @@ def calculate_all_metrics(
     elif equity_curve is None:
         equity_curve = np.cumprod(1 + returns)
 
+    # Plain float64 arrays from here on, so every metric takes the NumPy path
+    returns = np.asarray(returns, dtype=np.float64)
+    equity_curve = np.asarray(equity_curve, dtype=np.float64)
+
     # Standard metrics
     metrics = {
         'annual_return': annual_return(returns, periods_per_year),
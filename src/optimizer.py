@@ -7,10 +7,42 @@ Each asset contributes equally to portfolio risk.
 
 import numpy as np
 import pandas as pd
+from scipy.linalg.blas import get_blas_funcs
 from scipy.optimize import minimize
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 from sklearn.covariance import LedoitWolf
 
+from src.hrp import hrp_weights
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: fall back to the interpreted kernel
+    njit = None
+
+
+def sample_covariance(returns: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+    """
+    Sample covariance (ddof=1) of returns via one BLAS syrk call.
+
+    Equivalent to returns.cov().values for NaN-free data. The centered
+    returns are passed to syrk as X' (F-ordered view, no copy), which forms
+    only the upper triangle of X'X; it is then mirrored.
+
+    Args:
+        returns: Asset returns (N x M where N=days, M=assets), without NaNs
+
+    Returns:
+        Covariance matrix (M x M) as float64
+    """
+    X = np.asarray(returns, dtype=np.float64)
+    X = X - X.mean(axis=0)
+
+    syrk = get_blas_funcs('syrk', (X,))
+    upper = syrk(1.0 / (X.shape[0] - 1), X.T, trans=0)
+
+    return upper + np.triu(upper, 1).T
+
 
 def estimate_covariance_shrinkage(returns: pd.DataFrame) -> Tuple[np.ndarray, float]:
     """
@@ -36,13 +68,163 @@ def estimate_covariance_shrinkage(returns: pd.DataFrame) -> Tuple[np.ndarray, fl
     return lw.covariance_, lw.shrinkage_
 
 
-def optimize_weights(returns: pd.DataFrame, use_shrinkage: bool = False) -> np.ndarray:
+def estimate_covariance_shrinkage_batch(windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ledoit-Wolf shrinkage for a stack of return windows in one pass.
+
+    Vectorized form of estimate_covariance_shrinkage (same estimator as
+    sklearn's LedoitWolf) so that every rebalance window of a backtest is
+    handled by a few batched matmuls instead of one fit per window.
+
+    The (B, W, N) stage may be float32 to halve its memory traffic; the
+    small (B, N, N) products are promoted to float64 before shrinkage.
+
+    Args:
+        windows: Array of returns with shape (B, W, N) for B windows of
+                W days and N assets (float32 or float64)
+
+    Returns:
+        Tuple of (shrunk covariance matrices (B, N, N), shrinkage coefficients (B,))
+    """
+    n_samples, n_features = windows.shape[1], windows.shape[2]
+
+    X = windows - windows.mean(axis=1, keepdims=True)
+    X_t = X.transpose(0, 2, 1)
+    X2 = X * X
+
+    emp_cov = (X_t @ X).astype(np.float64) / n_samples
+    emp_cov_trace = X2.sum(axis=1, dtype=np.float64) / n_samples
+    mu = emp_cov_trace.sum(axis=1) / n_features
+
+    # Same sums as sklearn's ledoit_wolf_shrinkage, per window
+    beta_ = (X2.transpose(0, 2, 1) @ X2).astype(np.float64).sum(axis=(1, 2))
+    delta_ = (emp_cov ** 2).sum(axis=(1, 2))
+
+    beta = (beta_ / n_samples - delta_) / (n_features * n_samples)
+    delta = (delta_ - 2.0 * mu * emp_cov_trace.sum(axis=1) + n_features * mu ** 2) / n_features
+    beta = np.minimum(beta, delta)
+    shrinkage = np.divide(beta, delta, out=np.zeros_like(beta), where=beta != 0)
+
+    shrunk_cov = (1.0 - shrinkage)[:, None, None] * emp_cov
+    shrunk_cov[:, np.arange(n_features), np.arange(n_features)] += (shrinkage * mu)[:, None]
+
+    return shrunk_cov, shrinkage
+
+
+def _ccd_sweeps(corr: np.ndarray, budgets: np.ndarray, x: np.ndarray,
+                tol: float, maxiter: int) -> int:
+    """CCD sweeps on a correlation matrix, updating x in place.
+
+    Returns the number of sweeps used, or -1 if not converged.
+    """
+    n_assets = x.shape[0]
+    x_prev = np.empty(n_assets)
+
+    budget_sum = 0.0
+    for i in range(n_assets):
+        budget_sum += budgets[i]
+
+    for sweep in range(maxiter):
+        for i in range(n_assets):
+            x_prev[i] = x[i]
+
+        for i in range(n_assets):
+            a = corr[i, i]
+            c = 0.0
+            for j in range(n_assets):
+                if j != i:
+                    c += corr[i, j] * x[j]
+            x[i] = (-c + np.sqrt(c * c + 4 * a * budgets[i])) / (2 * a)
+
+        # Rescale so that total risk equals total budget
+        risk = 0.0
+        for i in range(n_assets):
+            acc = 0.0
+            for j in range(n_assets):
+                acc += corr[i, j] * x[j]
+            risk += x[i] * acc
+        scale = np.sqrt(budget_sum / risk)
+
+        max_change = 0.0
+        for i in range(n_assets):
+            x[i] *= scale
+            max_change = max(max_change, abs(x[i] - x_prev[i]))
+
+        if max_change < tol:
+            return sweep + 1
+
+    return -1
+
+
+if njit is not None:
+    # Compiled eagerly at import for float64 inputs; the sweep loop then runs
+    # without per-coordinate NumPy dispatch.
+    _ccd_sweeps = njit(
+        ['i8(f8[:, ::1], f8[::1], f8[::1], f8, i8)'],
+        cache=True,
+        fastmath=True,
+        boundscheck=False
+    )(_ccd_sweeps)
+
+
+def _ccd_risk_parity(
+    cov_matrix: np.ndarray,
+    budgets: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    maxiter: int = 50
+) -> Optional[np.ndarray]:
+    """
+    Solve the risk budgeting problem by cyclical coordinate descent (CCD).
+
+    Works on the correlation form of the covariance matrix and minimizes the
+    convex objective 0.5 * x'Cx - b'log(x), whose optimum has every asset's
+    risk contribution x_i * (Cx)_i equal to its budget b_i. Each coordinate
+    update is the positive root of a scalar quadratic, so there are no
+    gradients, Hessians or line searches.
+
+    Based on:
+    Griveau-Billion, Richard & Roncalli (2013) "A Fast Algorithm for
+    Computing High-dimensional Risk Parity Portfolios"
+
+    Args:
+        cov_matrix: Covariance matrix of asset returns (positive variances)
+        budgets: Risk budgets per asset (default: equal budgets)
+        tol: Convergence tolerance on the change of x between sweeps
+        maxiter: Maximum number of sweeps over all coordinates
+
+    Returns:
+        Array of weights summing to 1.0, or None if not converged
+    """
+    n_assets = cov_matrix.shape[0]
+
+    if budgets is None:
+        budgets = np.full(n_assets, 1.0 / n_assets)
+
+    # Correlation form: unit diagonal keeps the iteration well scaled
+    vols = np.sqrt(np.diag(cov_matrix))
+    corr = np.ascontiguousarray(cov_matrix / np.outer(vols, vols))
+
+    x = np.full(n_assets, 1.0 / np.sqrt(n_assets))
+
+    if _ccd_sweeps(corr, np.ascontiguousarray(budgets, dtype=np.float64),
+                   x, tol, maxiter) < 0:
+        return None
+
+    weights = x / vols
+    return weights / weights.sum()
+
+
+def optimize_weights(
+    returns: pd.DataFrame,
+    use_shrinkage: bool = False,
+    cov_matrix: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
     Calculate risk parity weights for a portfolio (v1.2 with shrinkage).
 
     The objective is to find weights such that each asset contributes equally
-    to the portfolio's total risk. This is achieved by minimizing the standard
-    deviation of risk contributions across all assets.
+    to the portfolio's total risk. Solved by cyclical coordinate descent, with
+    SLSQP minimizing the standard deviation of risk contributions as fallback.
 
     v1.2 Feature: Optional Ledoit-Wolf shrinkage for more robust covariance estimation.
     Shrinkage reduces noise in covariance estimates, leading to more stable weights.
@@ -50,6 +232,9 @@ def optimize_weights(returns: pd.DataFrame, use_shrinkage: bool = False) -> np.n
     Args:
         returns: DataFrame of asset returns (N x M where N=days, M=assets)
         use_shrinkage: Whether to use Ledoit-Wolf shrinkage (v1.2 feature, default False)
+        cov_matrix: Precomputed covariance matrix of returns (e.g. from a rolling
+                   estimate). When given, it is used as-is and no covariance is
+                   estimated from returns.
 
     Returns:
         Array of optimal weights summing to 1.0
@@ -63,28 +248,63 @@ def optimize_weights(returns: pd.DataFrame, use_shrinkage: bool = False) -> np.n
     if returns.isnull().any().any():
         raise ValueError("Returns contains NaN values")
 
-    # Use shrinkage estimator if requested (v1.2)
-    if use_shrinkage:
+    # Use a precomputed covariance if given, else shrinkage if requested (v1.2)
+    if cov_matrix is not None:
+        cov_matrix = np.asarray(cov_matrix)
+    elif use_shrinkage:
         cov_matrix, shrinkage_coef = estimate_covariance_shrinkage(returns)
         cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
     else:
-        cov_matrix = returns.cov()
+        cov_matrix = sample_covariance(returns)
     n_assets = len(returns.columns)
 
+    # Plain writable C-ordered ndarray for the solver loop (no pandas
+    # alignment per call; the compiled kernel rejects read-only views)
+    cov = np.require(cov_matrix, np.float64, ['C', 'W'])
+
+    if np.all(np.diag(cov) > 1e-20):
+        # Near-singular covariance (e.g. a large universe of highly correlated
+        # ETFs): full-covariance risk parity is unstable, use HRP instead
+        if np.linalg.cond(cov) > 1e10:
+            print("Warning: Ill-conditioned covariance, using hierarchical risk parity weights")
+            return hrp_weights(cov)
+
+        # Fast path: closed-form coordinate updates, SLSQP only if CCD fails
+        weights = _ccd_risk_parity(cov)
+        if weights is not None:
+            return weights
+
     def risk_parity_objective(weights):
         """Objective function: minimize std deviation of risk contributions."""
-        portfolio_vol = np.sqrt(weights @ cov_matrix @ weights)
+        risk_contrib = _risk_contribution_kernel(weights, cov)
 
-        # Avoid division by zero
-        if portfolio_vol < 1e-10:
+        # Avoid division by zero (kernel returns zeros for a zero-vol portfolio)
+        if not risk_contrib.any():
             return 1e10
 
-        marginal_contrib = cov_matrix @ weights
-        risk_contrib = weights * marginal_contrib / portfolio_vol
-
         # Minimize standard deviation of risk contributions
         return np.std(risk_contrib)
 
+    def risk_parity_gradient(weights):
+        """Analytic gradient of the objective (avoids finite differences)."""
+        portfolio_vol = np.sqrt(weights @ cov @ weights)
+
+        if portfolio_vol < 1e-10:
+            return np.zeros(n_assets)
+
+        marginal_contrib = cov @ weights
+        risk_contrib = weights * marginal_contrib / portfolio_vol
+        deviation = risk_contrib - risk_contrib.mean()
+        std_contrib = np.sqrt(deviation @ deviation / n_assets)
+
+        if std_contrib < 1e-15:
+            return np.zeros(n_assets)
+
+        # d std / d RC_i, chained through RC_i = w_i * (Σw)_i / σ_p
+        g = deviation / (n_assets * std_contrib)
+        return ((g * marginal_contrib + cov @ (g * weights)) / portfolio_vol
+                - (g @ risk_contrib) * marginal_contrib / portfolio_vol**2)
+
     # Initial guess: equal weights
     x0 = np.array([1/n_assets] * n_assets)
 
@@ -99,21 +319,59 @@ def optimize_weights(returns: pd.DataFrame, use_shrinkage: bool = False) -> np.n
         risk_parity_objective,
         x0,
         method='SLSQP',
+        jac=risk_parity_gradient,
         bounds=bounds,
         constraints=constraints,
         options={'maxiter': 1000, 'ftol': 1e-9}
     )
 
     if not result.success:
-        # Fallback: inverse volatility weights
-        print(f"Warning: Optimization failed ({result.message}), using inverse volatility weights")
-        return _inverse_volatility_weights(cov_matrix)
+        # Fallback: hierarchical risk parity (no matrix inversion)
+        print(f"Warning: Optimization failed ({result.message}), using hierarchical risk parity weights")
+        return hrp_weights(cov)
 
     return result.x
 
 
 
 
+def _risk_contribution_kernel(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
+    """Loop form of risk_contribution: one pass for Σw, one for w'Σw."""
+    n_assets = weights.shape[0]
+    marginal_contrib = np.empty(n_assets)
+    portfolio_var = 0.0
+
+    for i in range(n_assets):
+        acc = 0.0
+        for j in range(n_assets):
+            acc += cov_matrix[i, j] * weights[j]
+        marginal_contrib[i] = acc
+        portfolio_var += weights[i] * acc
+
+    risk_contrib = np.zeros(n_assets)
+    portfolio_vol = np.sqrt(max(portfolio_var, 0.0))
+
+    if portfolio_vol < 1e-10:
+        # Edge case: zero volatility portfolio
+        return risk_contrib
+
+    for i in range(n_assets):
+        risk_contrib[i] = weights[i] * marginal_contrib[i] / portfolio_vol
+
+    return risk_contrib
+
+
+if njit is not None:
+    # Compiled eagerly at import for float64 inputs, so no JIT happens
+    # inside a backtest or solver callback.
+    _risk_contribution_kernel = njit(
+        ['f8[::1](f8[::1], f8[:, ::1])'],
+        cache=True,
+        fastmath=True,
+        boundscheck=False
+    )(_risk_contribution_kernel)
+
+
 def risk_contribution(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray:
     """
     Calculate each asset's contribution to portfolio risk.
@@ -133,16 +391,10 @@ def risk_contribution(weights: np.ndarray, cov_matrix: np.ndarray) -> np.ndarray
     Returns:
         Array of risk contributions for each asset
     """
-    portfolio_vol = np.sqrt(weights @ cov_matrix @ weights)
-
-    if portfolio_vol < 1e-10:
-        # Edge case: zero volatility portfolio
-        return np.zeros_like(weights)
-
-    marginal_contrib = cov_matrix @ weights
-    risk_contrib = weights * marginal_contrib / portfolio_vol
-
-    return risk_contrib
+    return _risk_contribution_kernel(
+        np.require(weights, np.float64, ['C', 'W']),
+        np.require(cov_matrix, np.float64, ['C', 'W'])
+    )
 
 
 def apply_volatility_target(
@@ -199,7 +451,8 @@ def apply_volatility_target(
 def optimize_weights_constrained(
     returns: pd.DataFrame,
     asset_classes: dict,
-    constraints: dict
+    constraints: dict,
+    cov_matrix: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
     Calculate risk parity weights with asset class constraints (v1.2).
@@ -213,6 +466,8 @@ def optimize_weights_constrained(
                       e.g., {'Stocks': ['SPY', 'QQQ'], 'Bonds': ['TLT', 'IEF']}
         constraints: Dict with min/max bounds per asset class
                     e.g., {'Stocks': {'min': 0.25, 'max': 0.50}}
+        cov_matrix: Precomputed covariance matrix of returns (e.g. from a rolling
+                   estimate). When given, no covariance is estimated from returns.
 
     Returns:
         Constrained weights maintaining risk parity where possible
@@ -223,30 +478,41 @@ def optimize_weights_constrained(
     if returns.isnull().any().any():
         raise ValueError("Returns contains NaN values")
 
-    cov_matrix = returns.cov()
+    if cov_matrix is None:
+        cov_matrix = sample_covariance(returns)
+    else:
+        cov_matrix = np.asarray(cov_matrix, dtype=np.float64)
     n_assets = len(returns.columns)
     tickers = list(returns.columns)
 
     # Create ticker-to-index mapping
     ticker_idx = {t: i for i, t in enumerate(tickers)}
 
+    # Contiguous float64 copy for the compiled risk-contribution kernel
+    cov = np.require(cov_matrix, np.float64, ['C', 'W'])
+
     def risk_parity_objective(weights):
         """Minimize std deviation of risk contributions."""
-        portfolio_vol = np.sqrt(weights @ cov_matrix @ weights)
-        if portfolio_vol < 1e-10:
+        risk_contrib = _risk_contribution_kernel(weights, cov)
+
+        # Kernel returns zeros for a zero-vol portfolio
+        if not risk_contrib.any():
             return 1e10
-        marginal_contrib = cov_matrix @ weights
-        risk_contrib = weights * marginal_contrib / portfolio_vol
         return np.std(risk_contrib)
 
     # Initial guess: equal weights
     x0 = np.array([1/n_assets] * n_assets)
 
-    # Build constraint list
+    # Build constraint list (all linear, so their Jacobians are constant rows
+    # and SLSQP needs no finite differences for them)
     constraint_list = []
 
     # Sum to 1
-    constraint_list.append({'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0})
+    constraint_list.append({
+        'type': 'eq',
+        'fun': lambda x: np.sum(x) - 1.0,
+        'jac': lambda x, row=np.ones(n_assets): row
+    })
 
     # Asset class bounds
     for asset_class, tickers_list in asset_classes.items():
@@ -258,17 +524,21 @@ def optimize_weights_constrained(
 
         # Get indices for this asset class
         indices = [ticker_idx[t] for t in tickers_list if t in ticker_idx]
+        in_class = np.zeros(n_assets)
+        in_class[indices] = 1.0
 
         # Min constraint
         constraint_list.append({
             'type': 'ineq',
-            'fun': lambda x, idx=indices, m=min_alloc: np.sum(x[idx]) - m
+            'fun': lambda x, idx=indices, m=min_alloc: np.sum(x[idx]) - m,
+            'jac': lambda x, row=in_class: row
         })
 
         # Max constraint
         constraint_list.append({
             'type': 'ineq',
-            'fun': lambda x, idx=indices, m=max_alloc: m - np.sum(x[idx])
+            'fun': lambda x, idx=indices, m=max_alloc: m - np.sum(x[idx]),
+            'jac': lambda x, row=-in_class: row
         })
 
     # Bounds: no leverage, no shorting
@@ -293,7 +563,8 @@ def optimize_weights_constrained(
 
 def optimize_weights_4quadrant(
     returns: pd.DataFrame,
-    quadrant_mapping: dict
+    quadrant_mapping: dict,
+    cov_matrix: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
     Calculate weights using 4-quadrant risk balance (v1.3).
@@ -317,6 +588,8 @@ def optimize_weights_4quadrant(
                     'risk_allocation': 0.25  # Target risk contribution
                 }
             }
+        cov_matrix: Precomputed covariance matrix of returns (e.g. from a rolling
+                   estimate). When given, no covariance is estimated from returns.
 
     Returns:
         Weights balancing risk across 4 quadrants
@@ -327,14 +600,18 @@ def optimize_weights_4quadrant(
     if returns.isnull().any().any():
         raise ValueError("Returns contains NaN values")
 
-    # Calculate full covariance matrix
-    cov_matrix = returns.cov().values
+    # Calculate full covariance matrix (unless precomputed)
+    if cov_matrix is None:
+        cov_matrix = sample_covariance(returns)
+    else:
+        cov_matrix = np.asarray(cov_matrix, dtype=np.float64)
     tickers = list(returns.columns)
     ticker_idx = {t: i for i, t in enumerate(tickers)}
     n_assets = len(tickers)
 
-    # Initialize final weights
-    final_weights = np.zeros(n_assets)
+    # One row of full-universe weights per quadrant that has assets here
+    quadrant_rows = np.zeros((len(quadrant_mapping), n_assets))
+    n_quadrants = 0
 
     # For each quadrant, calculate risk parity weights within it
     for quadrant_name, quadrant_info in quadrant_mapping.items():
@@ -349,32 +626,31 @@ def optimize_weights_4quadrant(
         # Get indices for this quadrant
         indices = [ticker_idx[a] for a in valid_assets]
 
-        # Extract sub-returns for quadrant
-        quadrant_returns = returns[valid_assets]
+        # Extract sub-returns for quadrant (positional, no label lookup)
+        quadrant_returns = returns.iloc[:, indices]
 
-        # Calculate risk parity weights within quadrant
+        # Calculate risk parity weights within quadrant; its covariance is
+        # the quadrant's block of the full matrix, not a fresh estimate
         try:
-            quadrant_weights = optimize_weights(quadrant_returns)
+            quadrant_weights = optimize_weights(
+                quadrant_returns,
+                cov_matrix=cov_matrix[np.ix_(indices, indices)]
+            )
         except Exception as e:
             print(f"Warning: Quadrant {quadrant_name} optimization failed ({e}), using equal weights")
             quadrant_weights = np.ones(len(valid_assets)) / len(valid_assets)
 
         # Place quadrant weights in correct positions
-        quadrant_full_weights = np.zeros(n_assets)
-        for i, idx in enumerate(indices):
-            quadrant_full_weights[idx] = quadrant_weights[i]
+        quadrant_rows[n_quadrants, indices] = quadrant_weights
+        n_quadrants += 1
 
-        # Calculate quadrant's contribution to portfolio risk
-        # We need to scale this quadrant to contribute target_risk fraction
-        # Portfolio variance contribution from quadrant i: w_i^T Σ w_i
-        quadrant_variance = quadrant_full_weights @ cov_matrix @ quadrant_full_weights
+    # Calculate each quadrant's contribution to portfolio risk, for all
+    # quadrants at once: w_q^T Σ w_q for every row w_q
+    quadrant_rows = quadrant_rows[:n_quadrants]
+    quadrant_variances = np.einsum('qi,qi->q', quadrant_rows @ cov_matrix, quadrant_rows)
 
-        if quadrant_variance < 1e-10:
-            # Skip zero-variance quadrants
-            continue
-
-        # Add to final weights (will be scaled later)
-        final_weights += quadrant_full_weights
+    # Skip zero-variance quadrants; add the rest (will be scaled later)
+    final_weights = quadrant_rows[quadrant_variances >= 1e-10].sum(axis=0)
 
     # Normalize to sum to 1.0
     if final_weights.sum() < 1e-10:
@@ -385,24 +661,3 @@ def optimize_weights_4quadrant(
     final_weights = final_weights / final_weights.sum()
 
     return final_weights
-
-
-def _inverse_volatility_weights(cov_matrix: np.ndarray) -> np.ndarray:
-    """
-    Fallback method: inverse volatility weighting.
-
-    Args:
-        cov_matrix: Covariance matrix of asset returns
-
-    Returns:
-        Weights inversely proportional to asset volatilities
-    """
-    vols = np.sqrt(np.diag(cov_matrix))
-
-    # Avoid division by zero
-    vols = np.where(vols < 1e-10, 1e-10, vols)
-
-    weights = 1 / vols
-    weights = weights / weights.sum()
-
-    return weights
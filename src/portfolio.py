@@ -6,7 +6,7 @@ Handles portfolio state, position tracking, and rebalancing with transaction cos
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -49,6 +49,11 @@ class Portfolio:
         self.trade_history: List[Trade] = []
         self.commission_rate = commission_rate
 
+        # Commission of each recorded trade, filled alongside trade_history
+        # (grown by doubling) so reports can read them as one array
+        self._commissions = np.empty(64)
+        self._n_trades = 0
+
     def get_value(self, prices: pd.Series) -> float:
         """
         Calculate total portfolio value (positions + cash).
@@ -79,17 +84,21 @@ class Portfolio:
         Returns:
             Dict mapping ETF to weight (fraction of portfolio value)
         """
-        total_value = self.get_value(prices)
+        # Value each position once and derive both the total and the weights
+        # from those values (same summation order as get_value)
+        position_values = {
+            etf: shares * prices.get(etf, 0)
+            for etf, shares in self.positions.items()
+        }
+        total_value = self.cash + sum(position_values.values())
 
         if total_value == 0:
             return {etf: 0.0 for etf in self.positions.keys()}
 
-        weights = {}
-        for etf, shares in self.positions.items():
-            position_value = shares * prices.get(etf, 0)
-            weights[etf] = position_value / total_value
-
-        return weights
+        return {
+            etf: position_value / total_value
+            for etf, position_value in position_values.items()
+        }
 
     def rebalance(
         self,
@@ -219,10 +228,39 @@ class Portfolio:
                 )
 
             trades.append(trade)
-            self.trade_history.append(trade)
+            self._record_trade(trade)
 
         return trades
 
+    def _record_trade(self, trade: Trade) -> None:
+        """Append a trade to the history and its commission to the array."""
+        if self._n_trades == len(self._commissions):
+            self._commissions = np.concatenate([self._commissions, np.empty(len(self._commissions))])
+
+        self._commissions[self._n_trades] = trade.commission
+        self._n_trades += 1
+        self.trade_history.append(trade)
+
+    def commissions_array(self) -> np.ndarray:
+        """
+        Get the commission of every trade, in execution order.
+
+        Returns:
+            float64 array with one entry per trade in trade_history
+        """
+        return self._commissions[:self._n_trades].copy()
+
+    def summary(self) -> Tuple[np.ndarray, float, int]:
+        """
+        Get the per-trade commissions with their total and the trade count.
+
+        Returns:
+            (commission of every trade in execution order, total commissions,
+            number of trades)
+        """
+        commissions = self.commissions_array()
+        return commissions, float(commissions.sum()), self._n_trades
+
     def get_total_commissions(self) -> float:
         """Calculate total commissions paid."""
         return sum(trade.commission for trade in self.trade_history)
@@ -276,7 +314,7 @@ class Portfolio:
             commission=commission,
             side='buy'
         )
-        self.trade_history.append(trade)
+        self._record_trade(trade)
         return trade
 
     def sell(self, etf: str, shares: float, price: float, date: datetime = None) -> Optional[Trade]:
@@ -314,7 +352,7 @@ class Portfolio:
             commission=commission,
             side='sell'
         )
-        self.trade_history.append(trade)
+        self._record_trade(trade)
         return trade
 
     def reset(self):
@@ -322,6 +360,7 @@ class Portfolio:
         self.cash = self.initial_capital
         self.positions = {}
         self.trade_history = []
+        self._n_trades = 0
 
     def __repr__(self) -> str:
         return (
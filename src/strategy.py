@@ -10,7 +10,11 @@ import numpy as np
 import pandas as pd
 
 from src.metrics import calculate_all_metrics
-from src.optimizer import apply_volatility_target, optimize_weights
+from src.optimizer import (
+    apply_volatility_target,
+    estimate_covariance_shrinkage_batch,
+    optimize_weights,
+)
 from src.portfolio import Portfolio
 
 
@@ -114,37 +118,82 @@ class AllWeatherV1:
             print(f"Backtest: {start.date()} to {end.date()}")
             print(f"Rebalances: {len(rebalance_dates)}")
 
+        # Daily returns and their rolling covariance, computed once for the whole
+        # history. The window matches the lookback-1 returns available from
+        # lookback prices, so rolling_cov[t] is the sample covariance of the
+        # returns ending on day t.
+        all_returns = backtest_prices.pct_change()
+        n_assets = len(backtest_prices.columns)
+        rolling_cov = (
+            all_returns.rolling(window=self.lookback - 1).cov()
+            .to_numpy()
+            .reshape(len(all_returns), n_assets, n_assets)
+        )
+
+        # Positional view of the panel: the daily loop indexes plain arrays
+        # instead of looking dates up in the DatetimeIndex
+        dates_index = backtest_prices.index
+        prices_np = backtest_prices.to_numpy()
+        start_loc = dates_index.searchsorted(start, side='left')
+        end_loc = dates_index.searchsorted(end, side='right')
+        rebalance_locs = dates_index.get_indexer(rebalance_dates)
+        rebalance_locs = rebalance_locs[rebalance_locs >= 0]
+        is_rebalance = np.zeros(len(dates_index), dtype=bool)
+        is_rebalance[rebalance_locs] = True
+
+        # Running count of return rows with a NaN, so "is this window complete"
+        # is one subtraction per rebalance
+        nan_rows = np.concatenate(([0], np.cumsum(all_returns.isna().to_numpy().any(axis=1))))
+
+        # Ledoit-Wolf covariances for all rebalance dates, estimated together
+        # on the stacked (dates, window, assets) float32 returns; keyed by row index
+        shrunk_covs = {}
+        if self.use_shrinkage:
+            rebalance_locs = rebalance_locs[rebalance_locs >= self.lookback]
+            if len(rebalance_locs) > 0:
+                windows = np.lib.stride_tricks.sliding_window_view(
+                    all_returns.to_numpy(dtype=np.float32), self.lookback - 1, axis=0
+                )[rebalance_locs - self.lookback + 1].transpose(0, 2, 1)
+                shrunk_stack, _ = estimate_covariance_shrinkage_batch(windows)
+                shrunk_covs = dict(zip(rebalance_locs, shrunk_stack))
+
         equity_curve = []
         dates = []
         weights_history = []
         rebalances_skipped = 0
 
-        for date in backtest_prices.loc[start:end].index:
-            current_prices = backtest_prices.loc[date]
+        for loc in range(start_loc, end_loc):
+            date = dates_index[loc]
+            current_prices = pd.Series(prices_np[loc], index=backtest_prices.columns, name=date)
             portfolio_value = self.portfolio.get_value(current_prices)
             equity_curve.append(portfolio_value)
             dates.append(date)
 
-            if date not in rebalance_dates:
+            if not is_rebalance[loc]:
                 continue
 
-            lookback_start = backtest_prices.index.get_loc(date) - self.lookback
+            lookback_start = loc - self.lookback
             if lookback_start < 0:
                 continue
 
-            lookback_end = backtest_prices.index.get_loc(date)
-            hist_returns = backtest_prices.iloc[lookback_start:lookback_end].pct_change().dropna()
+            lookback_end = loc
 
-            if len(hist_returns) < self.lookback - 1:
+            # Need the full lookback-1 returns with no missing rows
+            if nan_rows[lookback_end] - nan_rows[lookback_start + 1] > 0:
                 continue
 
+            hist_returns = all_returns.iloc[lookback_start + 1:lookback_end]
+            cov_matrix = rolling_cov[lookback_end - 1]
+
             try:
-                weights = optimize_weights(hist_returns, use_shrinkage=self.use_shrinkage)
+                weights = optimize_weights(
+                    hist_returns,
+                    cov_matrix=shrunk_covs[lookback_end] if self.use_shrinkage else cov_matrix,
+                )
 
                 if self.target_volatility is not None:
-                    cov_matrix = hist_returns.cov()
                     weights = apply_volatility_target(
-                        weights, cov_matrix.values, target_vol=self.target_volatility
+                        weights, cov_matrix, target_vol=self.target_volatility
                     )
 
                 target_weights = dict(zip(backtest_prices.columns, weights))
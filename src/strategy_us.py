@@ -13,6 +13,29 @@ from src.optimizer import optimize_weights, apply_volatility_target, optimize_we
 from src.metrics import calculate_all_metrics
 
 
+def rolling_covariances(prices: pd.DataFrame, lookback: int = 252) -> np.ndarray:
+    """
+    Rolling sample covariance of daily returns for every day of a price panel.
+
+    Entry t is the covariance of the lookback-1 returns ending on day t (the
+    returns available from lookback prices), NaN before the first full window.
+    Strategies on the same prices and lookback can share one result.
+
+    Args:
+        prices: DataFrame of ETF prices
+        lookback: Days of prices per covariance window
+
+    Returns:
+        Array of shape (days, n_assets, n_assets)
+    """
+    n_assets = len(prices.columns)
+    return (
+        prices.pct_change().rolling(window=lookback - 1).cov()
+        .to_numpy()
+        .reshape(len(prices), n_assets, n_assets)
+    )
+
+
 class AllWeatherUS:
     """
     All Weather Strategy v1.1 - US Markets
@@ -28,7 +51,8 @@ class AllWeatherUS:
         rebalance_freq: str = 'W-MON',
         lookback: int = 252,
         commission_rate: float = 0.001,
-        target_volatility: Optional[float] = None
+        target_volatility: Optional[float] = None,
+        rolling_cov: Optional[np.ndarray] = None
     ):
         """
         Initialize US All Weather strategy.
@@ -41,18 +65,30 @@ class AllWeatherUS:
             commission_rate: Transaction cost (0.1% = 0.001, typical for US stocks)
             target_volatility: Target annualized volatility (e.g., 0.06 for 6%)
                              None = no targeting (recommended)
+            rolling_cov: Precomputed rolling_covariances(prices, lookback), so
+                        several strategies on the same data share one estimate
         """
+        if rolling_cov is not None and rolling_cov.shape[0] != len(prices):
+            raise ValueError("rolling_cov must have one matrix per price row")
+
         self.prices = prices
         self.initial_capital = initial_capital
         self.rebalance_freq = rebalance_freq
         self.lookback = lookback
         self.commission_rate = commission_rate
         self.target_volatility = target_volatility
+        self.rolling_cov = rolling_cov
         self.portfolio = Portfolio(initial_capital, commission_rate)
 
         # Store ETF universe
         self.etfs = list(prices.columns)
 
+    def _rolling_cov(self) -> np.ndarray:
+        """Shared rolling covariances if given, else computed for these prices."""
+        if self.rolling_cov is None:
+            self.rolling_cov = rolling_covariances(self.prices, self.lookback)
+        return self.rolling_cov
+
     def run_backtest(
         self,
         start_date: Optional[str] = None,
@@ -96,6 +132,9 @@ class AllWeatherUS:
         print(f"Backtest: {start_date.date()} to {end_date.date()}")
         print(f"Rebalances: {len(rebalance_dates)}")
 
+        # rolling_cov[t] covers the lookback-1 returns ending on day t
+        rolling_cov = self._rolling_cov()
+
         equity_curve = []
         dates = []
         weights_history = []
@@ -118,16 +157,17 @@ class AllWeatherUS:
                 if len(hist_returns) < self.lookback - 1:
                     continue
 
+                cov_matrix = rolling_cov[backtest_prices.index.get_loc(date) - 1]
+
                 try:
                     # Get risk parity weights
-                    weights = optimize_weights(hist_returns)
+                    weights = optimize_weights(hist_returns, cov_matrix=cov_matrix)
 
                     # Apply volatility targeting if specified
                     if self.target_volatility is not None:
-                        cov_matrix = hist_returns.cov()
                         weights = apply_volatility_target(
                             weights,
-                            cov_matrix.values,
+                            cov_matrix,
                             target_vol=self.target_volatility
                         )
 
@@ -213,7 +253,8 @@ class AllWeatherConstrainedUS(AllWeatherUS):
         lookback: int = 252,
         commission_rate: float = 0.001,
         target_volatility: Optional[float] = None,
-        constraints: Optional[Dict] = None
+        constraints: Optional[Dict] = None,
+        rolling_cov: Optional[np.ndarray] = None
     ):
         """
         Initialize constrained All Weather strategy.
@@ -226,9 +267,10 @@ class AllWeatherConstrainedUS(AllWeatherUS):
             commission_rate: Transaction cost
             target_volatility: Target annualized volatility (optional)
             constraints: Asset class constraints (uses defaults if None)
+            rolling_cov: Precomputed rolling covariances (see AllWeatherUS)
         """
         super().__init__(prices, initial_capital, rebalance_freq,
-                        lookback, commission_rate, target_volatility)
+                        lookback, commission_rate, target_volatility, rolling_cov)
 
         # Define asset classes
         self.asset_classes = self._define_asset_classes()
@@ -303,6 +345,9 @@ class AllWeatherConstrainedUS(AllWeatherUS):
         print(f"Rebalances: {len(rebalance_dates)}")
         print(f"Constraints: {self.constraints}")
 
+        # rolling_cov[t] covers the lookback-1 returns ending on day t
+        rolling_cov = self._rolling_cov()
+
         equity_curve = []
         dates = []
         weights_history = []
@@ -325,21 +370,23 @@ class AllWeatherConstrainedUS(AllWeatherUS):
                 if len(hist_returns) < self.lookback - 1:
                     continue
 
+                cov_matrix = rolling_cov[backtest_prices.index.get_loc(date) - 1]
+
                 try:
                     # Use constrained optimizer
                     weights = optimize_weights_constrained(
                         hist_returns,
                         self.asset_classes,
-                        self.constraints
+                        self.constraints,
+                        cov_matrix=cov_matrix
                     )
 
                     # Apply volatility targeting if specified
                     if self.target_volatility is not None:
                         from src.optimizer import apply_volatility_target
-                        cov_matrix = hist_returns.cov()
                         weights = apply_volatility_target(
                             weights,
-                            cov_matrix.values,
+                            cov_matrix,
                             target_vol=self.target_volatility
                         )
 
@@ -427,7 +474,8 @@ class AllWeather4QuadrantUS(AllWeatherUS):
         rebalance_freq: str = 'W-MON',
         lookback: int = 252,
         commission_rate: float = 0.001,
-        target_volatility: Optional[float] = None
+        target_volatility: Optional[float] = None,
+        rolling_cov: Optional[np.ndarray] = None
     ):
         """
         Initialize 4-quadrant All Weather strategy.
@@ -440,9 +488,10 @@ class AllWeather4QuadrantUS(AllWeatherUS):
             commission_rate: Transaction cost (0.1% = 0.001)
             target_volatility: Target annualized volatility (e.g., 0.05 for 5%)
                              Recommended: 0.05 for max drawdown ~-9%
+            rolling_cov: Precomputed rolling covariances (see AllWeatherUS)
         """
         super().__init__(prices, initial_capital, rebalance_freq,
-                        lookback, commission_rate, target_volatility)
+                        lookback, commission_rate, target_volatility, rolling_cov)
 
         # Define 4 economic environment quadrants
         self.quadrant_mapping = self._define_quadrants()
@@ -507,6 +556,9 @@ class AllWeather4QuadrantUS(AllWeatherUS):
         print(f"Backtest (4-Quadrant): {start_date.date()} to {end_date.date()}")
         print(f"Rebalances: {len(rebalance_dates)}")
 
+        # rolling_cov[t] covers the lookback-1 returns ending on day t
+        rolling_cov = self._rolling_cov()
+
         equity_curve = []
         dates = []
         weights_history = []
@@ -529,19 +581,21 @@ class AllWeather4QuadrantUS(AllWeatherUS):
                 if len(hist_returns) < self.lookback - 1:
                     continue
 
+                cov_matrix = rolling_cov[backtest_prices.index.get_loc(date) - 1]
+
                 try:
                     # Use 4-quadrant optimizer
                     weights = optimize_weights_4quadrant(
                         hist_returns,
-                        self.quadrant_mapping
+                        self.quadrant_mapping,
+                        cov_matrix=cov_matrix
                     )
 
                     # Apply volatility targeting if specified
                     if self.target_volatility is not None:
-                        cov_matrix = hist_returns.cov()
                         weights = apply_volatility_target(
                             weights,
-                            cov_matrix.values,
+                            cov_matrix,
                             target_vol=self.target_volatility
                         )
 
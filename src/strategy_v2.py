@@ -4,7 +4,8 @@ All Weather Strategy v2.0 - Daily Mean-Reversion
 Extends v1.2 with daily drift checking and per-asset rebalancing.
 """
 
-from typing import Optional, List, Dict
+import hashlib
+from typing import Optional, List, Dict, Tuple
 import numpy as np
 import pandas as pd
 
@@ -12,6 +13,53 @@ from src.metrics import calculate_all_metrics
 from src.optimizer import optimize_weights
 from src.portfolio import Portfolio
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: fall back to the array-at-once drift scan
+    njit = None
+
+# Weekly target weights keyed by (lookback price window, shrinkage flag).
+# Shared by every backtest in the process, so sweeps over drift thresholds or
+# start dates on the same prices optimize each week's window only once.
+_WEIGHTS_CACHE: Dict[Tuple[bytes, bool], np.ndarray] = {}
+_WEIGHTS_CACHE_SIZE = 8192
+
+
+def _quiet_run_kernel(price_rows: np.ndarray, shares: np.ndarray, target: np.ndarray,
+                      cash: float, threshold: float) -> np.ndarray:
+    """Day-by-day values of fixed holdings, stopping at the first drift breach."""
+    n_days, n_assets = price_rows.shape
+    totals = np.empty(n_days)
+    position_values = np.empty(n_assets)
+
+    for t in range(n_days):
+        held = 0.0
+        for j in range(n_assets):
+            position_values[j] = price_rows[t, j] * shares[j]
+            held += position_values[j]
+        total = cash + held
+
+        for j in range(n_assets):
+            current = position_values[j] / total if total != 0 else 0.0
+            # NaN targets (assets without a target weight) never breach
+            if abs(current - target[j]) > threshold:
+                return totals[:t]
+
+        totals[t] = total
+
+    return totals
+
+
+if njit is not None:
+    # Compiled eagerly at import. No fastmath: the sum must keep its
+    # left-to-right rounding and NaN targets must compare False.
+    _quiet_run_kernel = njit(
+        ['f8[::1](f8[:, ::1], f8[::1], f8[::1], f8, f8)'],
+        cache=True,
+        boundscheck=False
+    )(_quiet_run_kernel)
+
 
 class AllWeatherV2:
     """
@@ -55,6 +103,7 @@ class AllWeatherV2:
         self.commission_rate = commission_rate
         self.drift_threshold = drift_threshold
         self.use_shrinkage = use_shrinkage
+        self.etfs = list(prices.columns)
 
         self.portfolio = Portfolio(initial_capital, commission_rate)
         self.target_weights: Optional[Dict[str, float]] = None
@@ -64,39 +113,125 @@ class AllWeatherV2:
         """
         Check each asset for drift beyond threshold.
 
+        Weights and drifts are computed as arrays over the strategy's ETFs;
+        trade records are only built for the assets that breach the threshold.
+
+        Args:
+            current_prices: Prices for the day, indexed like the price columns
+
         Returns list of trades needed: [{'asset': str, 'action': 'buy'|'sell', 'drift': float}]
         """
         if self.target_weights is None:
             return []
 
+        n_assets = len(self.etfs)
+        prices = current_prices.to_numpy(dtype=np.float64)
+        shares, target = self._holding_arrays()
+
+        # Left-to-right running sum: same rounding as Portfolio.get_value
+        position_values = shares * prices
+        total_value = self.portfolio.cash + (position_values.cumsum()[-1] if n_assets else 0.0)
+        if total_value == 0:
+            current = np.zeros(n_assets)
+        else:
+            current = position_values / total_value
+
+        drift = current - target
+        # NaN targets (assets without a target weight) never breach
+        breached = np.abs(drift) > self.drift_threshold
+        if not breached.any():
+            return []
+
         trades_needed = []
-        current_weights = self.portfolio.get_weights(current_prices)
-
-        for asset, target_weight in self.target_weights.items():
-            current_weight = current_weights.get(asset, 0.0)
-            drift = current_weight - target_weight
-
-            if drift > self.drift_threshold:
-                # Overweight: sell back to target
-                trades_needed.append({
-                    'asset': asset,
-                    'action': 'sell',
-                    'drift': drift,
-                    'current_weight': current_weight,
-                    'target_weight': target_weight,
-                })
-            elif drift < -self.drift_threshold:
-                # Underweight: buy back to target
-                trades_needed.append({
-                    'asset': asset,
-                    'action': 'buy',
-                    'drift': drift,
-                    'current_weight': current_weight,
-                    'target_weight': target_weight,
-                })
+        for i in np.flatnonzero(breached):
+            trades_needed.append({
+                'asset': self.etfs[i],
+                # Overweight: sell back to target; underweight: buy back to target
+                'action': 'sell' if drift[i] > 0 else 'buy',
+                'drift': drift[i],
+                'current_weight': current[i],
+                'target_weight': target[i],
+            })
 
         return trades_needed
 
+    def _holding_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Shares held and target weights as arrays over self.etfs (NaN: no target)."""
+        n_assets = len(self.etfs)
+        positions = self.portfolio.positions
+        shares = np.fromiter((positions.get(etf, 0.0) for etf in self.etfs), np.float64, n_assets)
+        target = np.fromiter(
+            (self.target_weights.get(etf, np.nan) for etf in self.etfs), np.float64, n_assets
+        )
+        return shares, target
+
+    def _quiet_day_values(self, price_rows: np.ndarray) -> np.ndarray:
+        """
+        Portfolio values over upcoming days until one would trigger a drift trade.
+
+        Holdings and cash stay fixed while nothing trades, so each day's value
+        is cash + price row @ shares and its drifts follow from the same
+        products; a whole run of days is evaluated in one pass.
+
+        Args:
+            price_rows: Prices of the upcoming days (days x ETFs, column order)
+
+        Returns:
+            Values of the leading days on which no asset breaches the drift
+            threshold (the first breaching day is not included)
+        """
+        shares, target = self._holding_arrays()
+
+        if njit is not None:
+            # Walks the days in order and stops at the first breach
+            return _quiet_run_kernel(
+                np.require(price_rows, np.float64, ['C']), shares, target,
+                float(self.portfolio.cash), float(self.drift_threshold)
+            )
+
+        position_values = price_rows * shares
+
+        # Left-to-right running sum per day: same rounding as Portfolio.get_value
+        totals = self.portfolio.cash + position_values.cumsum(axis=1)[:, -1]
+        current = np.divide(
+            position_values, totals[:, None],
+            out=np.zeros_like(position_values), where=totals[:, None] != 0
+        )
+
+        breached = (np.abs(current - target) > self.drift_threshold).any(axis=1)
+        n_quiet = breached.argmax() if breached.any() else len(breached)
+        return totals[:n_quiet]
+
+    def optimize_window(self, window_prices: pd.DataFrame) -> Optional[np.ndarray]:
+        """
+        Risk parity weights for one lookback window of prices, memoized.
+
+        Args:
+            window_prices: Prices over the lookback window ending before the
+                          rebalance date
+
+        Returns:
+            Array of target weights in column order, or None if the window
+            has too few complete return rows
+        """
+        values = np.ascontiguousarray(window_prices.to_numpy(dtype=np.float64))
+        digest = hashlib.blake2b(values.tobytes(), digest_size=16)
+        digest.update(repr(values.shape).encode())
+        key = (digest.digest(), self.use_shrinkage)
+
+        weights = _WEIGHTS_CACHE.get(key)
+        if weights is None:
+            hist_returns = window_prices.pct_change().dropna()
+            if len(hist_returns) < self.lookback - 1:
+                return None
+
+            weights = optimize_weights(hist_returns, use_shrinkage=self.use_shrinkage)
+            if len(_WEIGHTS_CACHE) >= _WEIGHTS_CACHE_SIZE:
+                _WEIGHTS_CACHE.clear()
+            _WEIGHTS_CACHE[key] = weights
+
+        return weights
+
     def execute_daily_rebalance(
         self,
         trades_needed: List[Dict],
@@ -187,13 +322,26 @@ class AllWeatherV2:
 
         backtest_prices = self.prices.loc[:end].copy()
 
+        # Walk the days by position: one price row view per day, and the
+        # lookback window is a plain integer slice (no label lookups)
+        price_values = backtest_prices.to_numpy()
+        columns = backtest_prices.columns
+        first_idx = backtest_prices.index.searchsorted(start)
+
+        # Holdings only change on Mondays and on drift trades, so the days in
+        # between are valued as one block until the next breach or Monday
+        # (skipped for subclasses with their own drift rule)
+        fast_forward = type(self).check_daily_drift is AllWeatherV2.check_daily_drift
+        mondays = np.flatnonzero(backtest_prices.index.weekday == 0)
+        quiet_until = first_idx
+
         if verbose:
             print(f"Backtest: {start.date()} to {end.date()}")
             print(f"Drift threshold: {self.drift_threshold:.1%}")
 
-        # Tracking variables
-        equity_curve = []
-        dates = []
+        # Tracking variables (one portfolio value per backtest day, filled by position)
+        dates = pd.DatetimeIndex(backtest_prices.index[first_idx:], freq=None).rename(None)
+        equity_curve = np.empty(len(dates))
         weights_history = []
         daily_rebalance_count = 0
         weekly_rebalance_count = 0
@@ -201,14 +349,26 @@ class AllWeatherV2:
         last_rebalance_week = None  # Track last week we rebalanced (I1 - Monday holiday handling)
 
         # Main backtest loop
-        for date in backtest_prices.loc[start:end].index:
+        for current_idx, date in enumerate(dates, start=first_idx):
+            if current_idx < quiet_until:
+                continue  # Already valued as part of a quiet block
+
+            if fast_forward and self.target_weights is not None and date.weekday() != 0:
+                next_monday = mondays.searchsorted(current_idx)
+                block_end = mondays[next_monday] if next_monday < len(mondays) else len(price_values)
+                quiet_values = self._quiet_day_values(price_values[current_idx:block_end])
+
+                if len(quiet_values):
+                    quiet_until = current_idx + len(quiet_values)
+                    equity_curve[current_idx - first_idx:quiet_until - first_idx] = quiet_values
+                    continue
+
             weekly_updated_today = False  # I3 - Race condition guard
-            current_prices = backtest_prices.loc[date]
+            current_prices = pd.Series(price_values[current_idx], index=columns, name=date, copy=False)
             portfolio_value = self.portfolio.get_value(current_prices)
 
             # Track equity curve
-            equity_curve.append(portfolio_value)
-            dates.append(date)
+            equity_curve[current_idx - first_idx] = portfolio_value
 
             # WEEKLY: Update target weights via risk parity optimization
             # I1 - Use week number comparison instead of exact date matching (handles Monday holidays)
@@ -216,8 +376,6 @@ class AllWeatherV2:
             is_new_week = current_week != last_rebalance_week
 
             if date.weekday() == 0 and is_new_week:  # Monday of a new week
-                # M1 - Cache the get_loc result for efficiency
-                current_idx = backtest_prices.index.get_loc(date)
                 lookback_start = current_idx - self.lookback
                 if lookback_start < 0:
                     # I2 - Add verbose logging when skipping due to insufficient data
@@ -226,13 +384,12 @@ class AllWeatherV2:
                     continue
 
                 lookback_end = current_idx
-                hist_returns = backtest_prices.iloc[lookback_start:lookback_end].pct_change().dropna()
-
-                if len(hist_returns) < self.lookback - 1:
-                    continue
 
                 try:
-                    weights = optimize_weights(hist_returns, use_shrinkage=self.use_shrinkage)
+                    weights = self.optimize_window(backtest_prices.iloc[lookback_start:lookback_end])
+                    if weights is None:
+                        continue
+
                     self.target_weights = dict(zip(backtest_prices.columns, weights))
                     weekly_rebalance_count += 1
                     last_rebalance_week = current_week  # I1 - Track the week we rebalanced
@@ -279,8 +436,8 @@ class AllWeatherV2:
             'equity_curve': equity_series,
             'returns': returns,
             'weights_history': weights_df,
-            'final_value': equity_curve[-1] if equity_curve else self.initial_capital,
-            'total_return': (equity_curve[-1] / self.initial_capital - 1) if equity_curve else 0.0,
+            'final_value': equity_curve[-1] if len(equity_curve) else self.initial_capital,
+            'total_return': (equity_curve[-1] / self.initial_capital - 1) if len(equity_curve) else 0.0,
             'metrics': calculate_all_metrics(returns, equity_series),
             'daily_rebalance_count': daily_rebalance_count,
             'weekly_rebalance_count': weekly_rebalance_count,
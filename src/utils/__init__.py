@@ -10,8 +10,10 @@ from .reporting import (
     print_improvement_summary,
     format_currency,
     format_percentage,
-    format_number
+    format_number,
+    format_table
 )
+from .backtest_cache import cached_result, code_version, prices_cache_key
 
 __all__ = [
     'print_section',
@@ -21,5 +23,9 @@ __all__ = [
     'print_improvement_summary',
     'format_currency',
     'format_percentage',
-    'format_number'
+    'format_number',
+    'format_table',
+    'cached_result',
+    'code_version',
+    'prices_cache_key'
 ]
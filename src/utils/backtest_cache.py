@@ -0,0 +1,93 @@
+"""
+On-disk cache of backtest results for the comparison scripts
+
+Results are pickled under results/cache, keyed on the price panel, the
+backtest parameters and the source of the src/ package, so a change to any
+of them reruns the backtest instead of printing stale numbers.
+"""
+
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+# Pickled backtest results (relative to the repository root scripts run from)
+CACHE_DIR = Path('results/cache')
+
+# Package whose source is part of every cache key
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def prices_cache_key(prices: pd.DataFrame) -> str:
+    """Hash the price panel (values, dates and tickers) for backtest cache keys."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(prices.to_numpy(dtype=np.float64).tobytes())
+    digest.update(prices.index.asi8.tobytes())
+    digest.update(repr(list(prices.columns)).encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of every src/ module, so edits to strategy code invalidate results."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(SRC_DIR.rglob('*.py')):
+        digest.update(str(path.relative_to(SRC_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def cached_result(
+    name: str,
+    prices_key: str,
+    params: Any,
+    compute: Callable[[], Any],
+    verbose: bool = False
+) -> Any:
+    """
+    Load a pickled backtest result, or compute and pickle it.
+
+    Args:
+        name: Cache file prefix (e.g. the strategy class name)
+        prices_key: Price panel hash from prices_cache_key
+        params: Every parameter that affects the result (hashed via repr)
+        compute: Produces the result on a cache miss
+        verbose: Print the cache file when a result is reused
+
+    Returns:
+        The cached or freshly computed result
+    """
+    params_key = hashlib.blake2b(repr(params).encode(), digest_size=8)
+    params_key.update(code_version().encode())
+    cache_path = CACHE_DIR / f"{name}_{prices_key}_{params_key.hexdigest()}.pkl"
+
+    try:
+        with open(cache_path, 'rb') as f:
+            result = pickle.load(f)
+        if verbose:
+            print(f"  (cached: {cache_path})")
+        return result
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # Missing or unreadable cache file: compute (and overwrite) it
+        pass
+
+    result = compute()
+
+    # Write to a temporary file and move it into place, so an interrupted
+    # write never leaves a truncated pickle under the final name
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Full disk or read-only results directory: just don't cache
+        tmp_path.unlink(missing_ok=True)
+
+    return result
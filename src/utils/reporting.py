@@ -43,6 +43,27 @@ def format_number(value: float, decimals: int = 2) -> str:
     return f"{value:.{decimals}f}"
 
 
+def format_table(table: pd.DataFrame, row_formats: Dict[str, str]) -> str:
+    """
+    Render a numeric table, formatting each row with its display format.
+
+    Args:
+        table: Numeric table with one row per metric label
+        row_formats: Row label -> format string (e.g. '{:.2%}')
+
+    Returns:
+        The formatted table as text
+    """
+    formatted = pd.DataFrame(
+        [[row_formats[label].format(value) for value in row]
+         for label, row in zip(table.index, table.to_numpy())],
+        index=table.index,
+        columns=table.columns
+    )
+
+    return formatted.to_string()
+
+
 def print_comparison_table(
     results_dict: Dict[str, Dict],
     portfolios_dict: Dict[str, Any],